@@ -1,25 +1,43 @@
 import io
 import os
+import json
 import time
 import wave
+import asyncio
 import logging
-import shutil
+import zipfile
+import tempfile
 from pathlib import Path
-from collections import deque
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Depends, Form
-from fastapi.responses import FileResponse, StreamingResponse, HTMLResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Depends, Form, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, StreamingResponse, HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
 from google.cloud import texttospeech
 from google.cloud import speech
 from google.cloud import secretmanager
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from core.faq_loader import load_all_faqs
-from core.index_builder import build_index
-from core.gemini_responder import polish_response_with_context
+from core.knowledge_base import KnowledgeBase
+from core.reloader import IndexReloader
+from core.jobs import JobRegistry
+from core.embeddings import embed_model_info
+from core.gemini_responder import polish_response_with_context, stream_response_with_context, ErrorText, PROMPT_CONTEXT_TOKENS
+from core.cache import SemanticCache, TTLCache
+from core.metrics import (
+    registry, Counter, CallbackMetric, REQUEST_SECONDS, ANSWERS, timed, start_request_timings, server_timing
+)
+from core.rag import retrieve_faq_chunks, format_context, NOT_FOUND_ANSWER
+from core.tts_pipeline import split_sentences, wav_stream_header, synthesize_pipelined
+from core.streaming_stt import GoogleStreamingRecognizer, FakeStreamingRecognizer, StreamingTranscription, TranscriptAssembler
+from core.question_index import normalize_question
+from core.sessions import SessionStore, fit_history, SESSION_WINDOW_TURNS
+from utils.concurrency import run_blocking
+from utils.security import (
+    RateLimiter, MemoryRateLimitBackend, SharedRateLimitBackend, RedisCounterStore, parse_rate_limit
+)
 
 # Set up credentials first for local development
 if os.getenv("GAE_ENV", "").startswith("standard") is False:
@@ -70,51 +88,257 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request stage timings. Every request's duration is recorded per endpoint; with TIMING_HEADER=true responses
+# also carry a Server-Timing header with the stages finished before the headers were sent (for streamed answers,
+# the stages before the stream started)
+TIMING_HEADER = os.getenv("TIMING_HEADER", "false").lower() == "true"
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    timings = start_request_timings()
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    endpoint = getattr(request.scope.get("endpoint"), "__name__", "other")
+    REQUEST_SECONDS.observe(elapsed, request.method, endpoint, str(response.status_code))
+    if TIMING_HEADER:
+        response.headers["Server-Timing"] = server_timing(timings, total=elapsed)
+    return response
+
 # Google Cloud clients
 tts_client = texttospeech.TextToSpeechClient()
 stt_client = speech.SpeechClient()
 
-# Rate limiting
-request_counts = {}
-MAX_REQUESTS_PER_MINUTE = 5
-TIME_WINDOW_SECONDS = 60
-
-async def rate_limit(request: Request):
-    ip = request.client.host
-    now = time.time()
-    timestamps = request_counts.setdefault(ip, deque())
-    while timestamps and timestamps[0] < now - TIME_WINDOW_SECONDS:
-        timestamps.popleft()
-    if len(timestamps) >= MAX_REQUESTS_PER_MINUTE:
-        wait = int((timestamps[0] + TIME_WINDOW_SECONDS) - now)
-        raise HTTPException(429, f"Rate limit exceeded. Try again in {wait} seconds.")
-    timestamps.append(now)
-
-# Load FAQs and build index
-faq_data = load_all_faqs("data")
-index = build_index(faq_data)
-
-# Function to reload FAQs and rebuild index
-def reload_knowledge_base():
-    global faq_data, index
+# Deadlines for the blocking calls made from async handlers
+STT_TIMEOUT_SECONDS = float(os.getenv("STT_TIMEOUT_SECONDS", 30))
+TTS_TIMEOUT_SECONDS = float(os.getenv("TTS_TIMEOUT_SECONDS", 30))
+ANSWER_TIMEOUT_SECONDS = float(os.getenv("ANSWER_TIMEOUT_SECONDS", 60))
+
+# Concurrent synthesize_speech calls per pipelined /api/ask-audio response
+TTS_MAX_PARALLEL = int(os.getenv("TTS_MAX_PARALLEL", 3))
+
+# Rate limiting: per client and endpoint group, as "requests/seconds". The in-process backend is exact for a
+# single worker; set RATE_LIMIT_BACKEND=redis with RATE_LIMIT_REDIS_URL to share limits across instances.
+RATE_LIMIT_ASK = parse_rate_limit(os.getenv("RATE_LIMIT_ASK", "5/60"))
+RATE_LIMIT_TTS = parse_rate_limit(os.getenv("RATE_LIMIT_TTS", "10/60"))
+RATE_LIMIT_TRANSCRIBE = parse_rate_limit(os.getenv("RATE_LIMIT_TRANSCRIBE", "10/60"))
+
+if os.getenv("RATE_LIMIT_BACKEND", "memory") == "redis":
+    rate_limiter = RateLimiter(SharedRateLimitBackend(RedisCounterStore(os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"))))
+else:
+    rate_limiter = RateLimiter(MemoryRateLimitBackend())
+
+def rate_limit(name: str, limit: tuple):
+    """
+    Dependency enforcing `limit` (requests, seconds) per client IP across the endpoints sharing `name`.
+    A plain function, so FastAPI runs it on the thread pool and a shared-store round trip doesn't block the loop.
+    """
+    requests, period = limit
+
+    def check(request: Request):
+        retry_after = rate_limiter.hit(name, request.client.host, requests, period)
+        if retry_after:
+            wait = max(1, round(retry_after))
+            raise HTTPException(429, f"Rate limit exceeded. Try again in {wait} seconds.", headers={"Retry-After": str(wait)})
+
+    return Depends(check)
+
+# Retrieval settings: off-topic questions with no vector match above the threshold (and no strong
+# keyword match) skip Gemini entirely
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 3))
+RETRIEVAL_SCORE_THRESHOLD = float(os.getenv("RETRIEVAL_SCORE_THRESHOLD", 0.5))
+# Retrieved passages sharing at least this fraction of their wording are sent to Gemini only once
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", 0.8))
+
+# Load FAQs and build index; a persisted index in INDEX_DIR is reused so cold starts skip re-embedding
+knowledge_base = KnowledgeBase(
+    "data",
+    index_dir=os.getenv("INDEX_DIR", "index_store"),
+    top_k=RETRIEVAL_TOP_K,
+    score_threshold=RETRIEVAL_SCORE_THRESHOLD
+)
+knowledge_base.refresh()
+index_reloader = IndexReloader(knowledge_base)
+
+# Schedule a background reload of FAQs; queries keep using the current index until the new one is swapped in.
+# Only changed files are re-parsed and re-embedded, and reloads requested mid-rebuild are merged.
+def reload_knowledge_base(full: bool = False, on_done=None) -> int:
+    logger.info("Scheduling knowledge base reload...")
+    return index_reloader.request(full=full, on_done=on_done)
+
+# Answer and TTS caches. Polished answers are reused for paraphrased questions (cosine similarity of the
+# query embeddings >= threshold) as long as the index generation hasn't changed since they were cached.
+answer_cache = SemanticCache(
+    threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.95)),
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", 1000)),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", 3600))
+)
+tts_cache = TTLCache(
+    max_entries=int(os.getenv("TTS_CACHE_SIZE", 256)),
+    ttl_seconds=float(os.getenv("TTS_CACHE_TTL_SECONDS", 3600))
+)
+
+# Conversation sessions: clients send a session id and the server keeps the recent turns plus a summary of older
+# ones, trimmed to HISTORY_TOKEN_BUDGET tokens in the prompt. Bounded by SESSION_MAX (LRU) and SESSION_TTL_SECONDS.
+sessions = SessionStore()
+
+# Metrics read at scrape time: cache counters and the size and generation of the served index
+CACHES = {"answers": answer_cache, "tts": tts_cache}
+registry.register(CallbackMetric(
+    "faq_cache_hits_total", "Cache hits.", lambda: {(name,): cache.stats()["hits"] for name, cache in CACHES.items()},
+    labelnames=("cache",), type="counter"
+))
+registry.register(CallbackMetric(
+    "faq_cache_misses_total", "Cache misses.", lambda: {(name,): cache.stats()["misses"] for name, cache in CACHES.items()},
+    labelnames=("cache",), type="counter"
+))
+registry.register(CallbackMetric(
+    "faq_cache_entries", "Entries in each cache.", lambda: {(name,): cache.stats()["entries"] for name, cache in CACHES.items()},
+    labelnames=("cache",)
+))
+registry.register(CallbackMetric(
+    "faq_index_nodes", "Indexed chunks in the served index.", lambda: {(): len(knowledge_base.nodes)}
+))
+registry.register(CallbackMetric(
+    "faq_index_faqs", "Parsed FAQ entries in the served index.", lambda: {(): knowledge_base.faq_count}
+))
+registry.register(CallbackMetric(
+    "faq_index_files", "Indexed files.", lambda: {(): len(knowledge_base.files)}
+))
+registry.register(CallbackMetric(
+    "faq_index_generation", "Generation of the served index, bumped on every swap.", lambda: {(): knowledge_base.generation}
+))
+registry.register(CallbackMetric(
+    "faq_sessions", "Active conversation sessions.", lambda: {(): len(sessions)}
+))
+registry.register(CallbackMetric(
+    "faq_index_rebuilding", "1 while a rebuild is running.", lambda: {(): int(index_reloader.state == "rebuilding")}
+))
+
+RAG_ERROR_ANSWER = ErrorText("I'm sorry, I encountered an error while processing your question. Please try again or contact support if the issue persists.")
+
+# Retrieval step: raw FAQ context for the query, or None when nothing relevant was found.
+# The hybrid retriever fuses vector and BM25 hits and drops those below their score thresholds; the passages
+# are deduplicated and packed best first into the prompt's context budget.
+def retrieve_context(user_query: str, embedding) -> str | None:
+    with timed("retrieve"):
+        chunks = retrieve_faq_chunks(knowledge_base.retriever, user_query, embedding, top_k=RETRIEVAL_TOP_K)
+    if not chunks:
+        logger.info(f"No relevant FAQ match for: {user_query}")
+        return None
+    return format_context(chunks, max_tokens=PROMPT_CONTEXT_TOKENS, dedup_threshold=CONTEXT_DEDUP_THRESHOLD)
+
+# Cached answers are served to any conversation, so only answers polished without one are stored; failed ones never are
+def cache_answer(user_query: str, embedding, generation: int, answer: str, failed: bool = False):
+    if not failed and not isinstance(answer, ErrorText):
+        answer_cache.put(user_query, embedding, generation, answer)
+
+# Questions that match a stored FAQ question exactly (after normalization) or nearly (question-only embedding
+# similarity >= QUESTION_MATCH_THRESHOLD) are answered from the stored answer, skipping retrieval and, by default, Gemini
+FAST_PATH_SKIP_POLISH = os.getenv("FAST_PATH_SKIP_POLISH", "true").lower() == "true"
+
+# Shared first step of answering. Returns (final answer or None, raw FAQ context, query embedding, answer source);
+# a final answer means Gemini isn't needed. The embedding is None when an exact question match made it unnecessary,
+# which is also the only case without an answer cache lookup. Speculative runs leave the cache hit/miss counters
+# alone, since most are discarded; the caller counts the lookup of one that is used.
+# It only looks at the question, so the conversation affects polishing alone: a question that matches a stored FAQ
+# question or a cached answer stands on its own and is answered the same way mid-conversation.
+def prepare_answer(user_query: str, generation: int, speculative: bool = False):
+    question_index = knowledge_base.question_index
+    embedding = None
+    match = question_index.match_exact(user_query)
+    if match is None:
+        with timed("embed"):
+            embedding = knowledge_base.embed_query(user_query)
+        if (cached := answer_cache.get(embedding, generation, count=not speculative)) is not None:
+            return cached, None, embedding, "cache"
+        match = question_index.match_near(embedding)
+
+    if match is not None:
+        logger.info(f"Fast path: {match['match']} match ({match['score']:.3f}) with \"{match['question']}\"")
+        if FAST_PATH_SKIP_POLISH:
+            return match["answer"], None, embedding, "fast_path"
+        return None, f"{match['question']}\n{match['answer']}", embedding, "gemini"
+
+    rag_response = retrieve_context(user_query, embedding)
+    if rag_response is None:
+        return NOT_FOUND_ANSWER, None, embedding, "not_found"
+    return None, rag_response, embedding, "gemini"
+
+# Core Gemini-enhanced RAG QA function
+def get_answer_with_gemini(user_query: str, chat_history: list = None, summary: str = None) -> str:
     try:
-        logger.info("Reloading knowledge base...")
-        faq_data = load_all_faqs("data")
-        index = build_index(faq_data)
-        logger.info(f"Knowledge base reloaded successfully. Loaded {len(faq_data)} FAQ entries.")
-        return True
+        generation = knowledge_base.generation
+        answer, rag_response, embedding, source = prepare_answer(user_query, generation)
+        if answer is not None:
+            ANSWERS.inc(source)
+            return answer
+        with timed("polish"):
+            answer = polish_response_with_context(user_query, rag_response, chat_history, summary)
+        ANSWERS.inc("gemini")
+        if not chat_history and not summary and embedding is not None:
+            cache_answer(user_query, embedding, generation, answer)
+        return answer
     except Exception as e:
-        logger.error(f"Failed to reload knowledge base: {e}")
-        return False
+        logger.error(f"Error in RAG query: {e}")
+        return RAG_ERROR_ANSWER
 
-# Core Gemini-enhanced RAG QA function
-def get_answer_with_gemini(user_query: str, chat_history: list = None) -> str:
+# Streaming variant: yields the polished answer as Gemini generates it. `prepared` is (generation, prepare_answer result)
+# when the first step already ran, e.g. speculatively while the user was still speaking.
+def stream_answer_with_gemini(user_query: str, chat_history: list = None, prepared: tuple = None, summary: str = None):
     try:
-        rag_response = index.query(user_query).response
-        return polish_response_with_context(user_query, rag_response, chat_history)
+        if prepared is None:
+            generation = knowledge_base.generation
+            prepared = generation, prepare_answer(user_query, generation)
+        generation, (answer, rag_response, embedding, source) = prepared
     except Exception as e:
         logger.error(f"Error in RAG query: {e}")
-        return "I'm sorry, I encountered an error while processing your question. Please try again or contact support if the issue persists."
+        yield RAG_ERROR_ANSWER
+        return
+    if answer is not None:
+        ANSWERS.inc(source)
+        yield answer
+        return
+
+    parts, failed = [], False
+    with timed("polish"):
+        for delta in stream_response_with_context(user_query, rag_response, chat_history, summary):
+            failed = failed or isinstance(delta, ErrorText)
+            parts.append(delta)
+            yield delta
+    ANSWERS.inc("gemini")
+    if not chat_history and not summary and embedding is not None:
+        cache_answer(user_query, embedding, generation, "".join(parts).strip(), failed)
+
+# Conversation context of a request as (session id, summary, recent turns). An unknown or expired session id gets a
+# fresh session, whose id is returned to the client. Requests without a session may still send their own `history`,
+# which is trimmed to the same window and token budget.
+def conversation(session_id: str | None, history: list | None = None):
+    if session_id:
+        context = sessions.context(session_id)
+        if context is None:
+            return sessions.create(), "", []
+        return session_id, *context
+    turns = [turn for turn in history or [] if isinstance(turn, dict)][-SESSION_WINDOW_TURNS:]
+    return None, *fit_history("", turns)
+
+# Records a question and its answer in the session; failed answers are left out so they don't steer later prompts
+def remember_turn(session_id: str | None, question: str, answer: str, failed: bool = False):
+    if session_id and answer and not failed and not isinstance(answer, ErrorText):
+        sessions.add_turn(session_id, question, answer)
+
+# Passes streamed answer deltas through, then records the whole answer in the session unless part of it was an error
+def remembering(deltas, session_id: str | None, question: str):
+    parts, failed = [], False
+    for delta in deltas:
+        failed = failed or isinstance(delta, ErrorText)
+        parts.append(delta)
+        yield delta
+    remember_turn(session_id, question, "".join(parts).strip(), failed)
+
+# Server-sent event formatting
+def sse_event(payload: dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
 
 # Audio streaming utility
 def stream_audio(audio_bytes):
@@ -125,73 +349,131 @@ def stream_audio(audio_bytes):
 # WAV format utility
 def create_wav(raw_audio, sample_rate=24000):
     buf = io.BytesIO()
-    with wave.open(buf, 'wb') as wf:
+    with timed("encode"), wave.open(buf, 'wb') as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(sample_rate)
         wf.writeframes(raw_audio)
     return buf.getvalue()
 
-# Request schema for text input
+# Blocking STT call: WEBM_OPUS audio -> transcript
+def recognize_speech(content: bytes) -> str:
+    config = speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+        sample_rate_hertz=48000,
+        language_code="en-US"
+    )
+    audio = speech.RecognitionAudio(content=content)
+    with timed("transcribe"):
+        response = stt_client.recognize(config=config, audio=audio, timeout=STT_TIMEOUT_SECONDS)
+    return " ".join([alt.transcript for r in response.results for alt in r.alternatives])
+
+# Blocking TTS call: text -> LINEAR16 audio at 24kHz
+def synthesize_speech(text: str, voice_name: str = "en-US-Studio-O") -> bytes:
+    cached = tts_cache.get((text, voice_name))
+    if cached is not None:
+        return cached
+    synth_input = texttospeech.SynthesisInput(text=text)
+    voice = texttospeech.VoiceSelectionParams(language_code="en-US", name=voice_name)
+    audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.LINEAR16, sample_rate_hertz=24000)
+    with timed("synthesize"):
+        tts_response = tts_client.synthesize_speech(input=synth_input, voice=voice, audio_config=audio_config, timeout=TTS_TIMEOUT_SECONDS)
+    tts_cache.put((text, voice_name), tts_response.audio_content)
+    return tts_response.audio_content
+
+# Request schema for text input; `history` is for clients without a session
 class TextRequest(BaseModel):
     text: str
+    session_id: str | None = None
     history: list | None = None
 
-# API: Audio-based question -> answer with TTS
-@app.post("/api/ask-audio", dependencies=[Depends(rate_limit)])
-async def ask_audio(file: UploadFile = File(...)):
+# Pipelined TTS: synthesize the answer sentence by sentence while Gemini is still generating it,
+# streaming LINEAR16 audio behind a single WAV header as each sentence is ready
+async def stream_spoken_answer(transcript: str, session_id: str | None = None, summary: str = "", turns: list = None):
+    deltas = remembering(stream_answer_with_gemini(transcript, turns, summary=summary), session_id, transcript)
+    sentences = iterate_in_threadpool(split_sentences(deltas))
+
+    async def synthesize(text):
+        return await run_blocking(synthesize_speech, text, timeout=TTS_TIMEOUT_SECONDS)
+
+    yield wav_stream_header(sample_rate=24000)
+    try:
+        async for pcm in synthesize_pipelined(sentences, synthesize, max_parallel=TTS_MAX_PARALLEL):
+            yield pcm
+    except Exception as e:
+        logger.error(f"Pipelined TTS error: {e!r}")
+
+# API: Audio-based question -> answer with TTS (`pipelined=true` streams audio sentence by sentence)
+@app.post("/api/ask-audio", dependencies=[rate_limit("ask", RATE_LIMIT_ASK)])
+async def ask_audio(file: UploadFile = File(...), pipelined: bool = False, session_id: str | None = Form(None)):
     content = await file.read()
     if not content:
         raise HTTPException(400, "No audio provided")
 
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-        sample_rate_hertz=48000,
-        language_code="en-US"
-    )
-    audio = speech.RecognitionAudio(content=content)
-    response = stt_client.recognize(config=config, audio=audio)
-    transcript = " ".join([alt.transcript for r in response.results for alt in r.alternatives])
+    try:
+        transcript = await run_blocking(recognize_speech, content, timeout=STT_TIMEOUT_SECONDS)
+    except TimeoutError:
+        raise HTTPException(504, "Speech recognition timed out.")
 
     if not transcript:
         raise HTTPException(400, "No speech detected")
 
     logger.info(f"Transcribed: {transcript}")
-    answer = get_answer_with_gemini(transcript)
+    session_id, summary, turns = conversation(session_id)
+    headers = {"X-Session-Id": session_id} if session_id else None
+    if pipelined:
+        return StreamingResponse(stream_spoken_answer(transcript, session_id, summary, turns), media_type="audio/wav", headers=headers)
 
-    synth_input = texttospeech.SynthesisInput(text=answer)
-    voice = texttospeech.VoiceSelectionParams(language_code="en-US", name="en-US-Studio-O")
-    audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.LINEAR16, sample_rate_hertz=24000)
-    tts_response = tts_client.synthesize_speech(input=synth_input, voice=voice, audio_config=audio_config)
-    wav_data = create_wav(tts_response.audio_content)
+    try:
+        answer = await run_blocking(get_answer_with_gemini, transcript, turns, summary, timeout=ANSWER_TIMEOUT_SECONDS)
+        remember_turn(session_id, transcript, answer)
+        audio_content = await run_blocking(synthesize_speech, answer, timeout=TTS_TIMEOUT_SECONDS)
+    except TimeoutError:
+        raise HTTPException(504, "Generating the spoken answer timed out.")
+    wav_data = create_wav(audio_content)
 
-    return StreamingResponse(stream_audio(wav_data), media_type="audio/wav")
+    return StreamingResponse(stream_audio(wav_data), media_type="audio/wav", headers=headers)
 
 # API: Text question -> text answer
-@app.post("/api/ask-text", dependencies=[Depends(rate_limit)])
+@app.post("/api/ask-text", dependencies=[rate_limit("ask", RATE_LIMIT_ASK)])
 async def ask_text(req: TextRequest):
-    answer = get_answer_with_gemini(req.text, req.history)
-    return {"answer": answer}
+    session_id, summary, turns = conversation(req.session_id, req.history)
+    try:
+        answer = await run_blocking(get_answer_with_gemini, req.text, turns, summary, timeout=ANSWER_TIMEOUT_SECONDS)
+    except TimeoutError:
+        raise HTTPException(504, "Generating the answer timed out.")
+    remember_turn(session_id, req.text, answer)
+    return {"answer": answer, "session_id": session_id}
+
+# API: Text question -> answer streamed as server-sent events ({"delta": ...} chunks, then {"done": true, "session_id"})
+@app.post("/api/ask-text-stream", dependencies=[rate_limit("ask", RATE_LIMIT_ASK)])
+async def ask_text_stream(req: TextRequest):
+    session_id, summary, turns = conversation(req.session_id, req.history)
+
+    # A sync generator is iterated on Starlette's thread pool, so retrieval and Gemini don't block the event loop
+    def events():
+        deltas = stream_answer_with_gemini(req.text, turns, summary=summary)
+        for delta in remembering(deltas, session_id, req.text):
+            yield sse_event({"delta": delta})
+        yield sse_event({"done": True, "session_id": session_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # API: Audio -> transcript only
-@app.post("/api/ask-text-transcribe")
+@app.post("/api/ask-text-transcribe", dependencies=[rate_limit("transcribe", RATE_LIMIT_TRANSCRIBE)])
 async def transcribe_audio(file: UploadFile = File(...)):
     content = await file.read()
     if not content:
         raise HTTPException(400, "No audio provided for transcription")
 
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-        sample_rate_hertz=48000,
-        language_code="en-US"
-    )
-    audio = speech.RecognitionAudio(content=content)
-
     try:
-        response = stt_client.recognize(config=config, audio=audio)
-        transcript = " ".join([alt.transcript for r in response.results for alt in r.alternatives])
+        transcript = await run_blocking(recognize_speech, content, timeout=STT_TIMEOUT_SECONDS)
     except Exception as e:
-        logger.error(f"Transcription error: {e}")
+        logger.error(f"Transcription error: {e!r}")
         raise HTTPException(500, "Failed to transcribe audio.")
 
     if not transcript:
@@ -200,73 +482,492 @@ async def transcribe_audio(file: UploadFile = File(...)):
     logger.info(f"Live Transcript: {transcript}")
     return {"transcript": transcript}
 
+# Streaming recognition over a WebSocket: the browser sends WEBM_OPUS chunks from the mic as binary messages and
+# {"type": "stop"} when the user stops talking (or just closes). Google's streaming recognizer ("fake" for local
+# testing treats each chunk as text) returns interim transcripts while the user is still speaking.
+STT_BACKEND = os.getenv("STT_BACKEND", "google").lower()
+# Longest audio stream accepted; Google's streaming recognition stops after about five minutes
+STT_STREAM_MAX_SECONDS = float(os.getenv("STT_STREAM_MAX_SECONDS", 290))
+# Speculative retrieval starts once the stable part of the transcript has at least this many words
+STT_SPECULATE_MIN_WORDS = int(os.getenv("STT_SPECULATE_MIN_WORDS", 3))
+
+if STT_BACKEND == "fake":
+    streaming_recognizer = FakeStreamingRecognizer()
+else:
+    streaming_recognizer = GoogleStreamingRecognizer(stt_client, timeout=STT_STREAM_MAX_SECONDS + STT_TIMEOUT_SECONDS)
+
+SPECULATIONS = registry.register(Counter(
+    "faq_speculative_retrievals_total",
+    "Retrievals started on a stable partial transcript, by whether the final transcript could use them.",
+    labelnames=("outcome",),
+))
+
+# Receives audio until the client stops or disconnects, or the stream gets too long, then ends the audio.
+# Returns True if the client disconnected.
+async def receive_audio(websocket: WebSocket, transcription: StreamingTranscription) -> bool:
+    deadline = asyncio.get_running_loop().time() + STT_STREAM_MAX_SECONDS
+    try:
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            message = await asyncio.wait_for(websocket.receive(), timeout=max(remaining, 0))
+            if message["type"] == "websocket.disconnect":
+                return True
+            if message.get("text") is not None:
+                break
+            if message.get("bytes"):
+                transcription.push(message["bytes"])
+    except asyncio.TimeoutError:
+        logger.info("Audio stream reached STT_STREAM_MAX_SECONDS, ending it.")
+    finally:
+        transcription.end()
+    return False
+
+# API: streamed audio -> live transcripts ({"type": "transcript", "text", "stable_text", "final"}), then with
+# `answer=true` the answer streamed as {"type": "delta"} messages and {"type": "done", "answer", "speculative"}.
+# The first answering step (embedding, fast path, retrieval) runs speculatively on stable partial transcripts, so
+# when the final transcript matches, only Gemini is left once the user stops talking.
+@app.websocket("/api/ws/ask-audio")
+async def ask_audio_stream(websocket: WebSocket, answer: bool = True, session_id: str | None = None):
+    name, (requests, period) = ("ask", RATE_LIMIT_ASK) if answer else ("transcribe", RATE_LIMIT_TRANSCRIBE)
+    retry_after = await run_in_threadpool(rate_limiter.hit, name, websocket.client.host, requests, period)
+    if retry_after:
+        await websocket.close(code=1008, reason=f"Rate limit exceeded. Try again in {max(1, round(retry_after))} seconds.")
+        return
+    await websocket.accept()
+
+    transcription = StreamingTranscription(streaming_recognizer)
+    receiver = asyncio.create_task(receive_audio(websocket, transcription))
+    assembler = TranscriptAssembler()
+    speculation = None  # (normalized text, index generation, task running prepare_answer)
+    sent = None
+    try:
+        try:
+            async for results in transcription.results():
+                text = assembler.update(results)
+                if (text, assembler.stable_text) != sent:
+                    sent = text, assembler.stable_text
+                    await websocket.send_json({"type": "transcript", "text": text, "stable_text": assembler.stable_text, "final": False})
+
+                stable = normalize_question(assembler.stable_text)
+                if (answer and len(stable.split()) >= STT_SPECULATE_MIN_WORDS
+                        and (speculation is None or (speculation[0] != stable and speculation[2].done()))):
+                    generation = knowledge_base.generation
+                    task = asyncio.create_task(run_blocking(
+                        prepare_answer, assembler.stable_text, generation, True, timeout=ANSWER_TIMEOUT_SECONDS
+                    ))
+                    # Discarded speculations are never awaited; retrieve their errors so they aren't reported as unhandled
+                    task.add_done_callback(lambda task: task.cancelled() or task.exception())
+                    speculation = (stable, generation, task)
+        except WebSocketDisconnect:
+            raise
+        except Exception as e:
+            logger.error(f"Streaming recognition error: {e!r}")
+            await websocket.send_json({"type": "error", "detail": "Speech recognition failed."})
+            return
+        # The audio ended because the client went away: there is no one left to answer
+        if receiver.done() and not receiver.cancelled() and receiver.result():
+            raise WebSocketDisconnect()
+
+        transcript = assembler.text.strip()
+        if not transcript:
+            await websocket.send_json({"type": "error", "detail": "No speech detected"})
+            return
+        logger.info(f"Streamed transcript: {transcript}")
+        await websocket.send_json({"type": "transcript", "text": transcript, "stable_text": transcript, "final": True})
+        if not answer:
+            return
+
+        session_id, summary, turns = conversation(session_id)
+        prepared = None
+        if speculation is not None:
+            stable, generation, task = speculation
+            if stable == normalize_question(transcript) and generation == knowledge_base.generation:
+                try:
+                    prepared = generation, await task
+                except Exception as e:
+                    logger.warning(f"Speculative retrieval failed, retrying: {e!r}")
+                else:
+                    _, _, embedding, source = prepared[1]
+                    if embedding is not None:
+                        answer_cache.record(hit=source == "cache")
+            SPECULATIONS.inc("used" if prepared else "discarded")
+
+        parts = []
+        deltas = remembering(stream_answer_with_gemini(transcript, turns, prepared, summary), session_id, transcript)
+        async for delta in iterate_in_threadpool(deltas):
+            parts.append(delta)
+            await websocket.send_json({"type": "delta", "delta": delta})
+        await websocket.send_json({
+            "type": "done", "answer": "".join(parts).strip(), "speculative": prepared is not None, "session_id": session_id
+        })
+    except WebSocketDisconnect:
+        logger.info("Audio stream client disconnected.")
+    finally:
+        transcription.end()
+        receiver.cancel()
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass  # already closed
+
 # API: Text -> TTS
-@app.post("/api/ask-tts")
+@app.post("/api/ask-tts", dependencies=[rate_limit("tts", RATE_LIMIT_TTS)])
 async def ask_tts(req: TextRequest):
-    synth_input = texttospeech.SynthesisInput(text=req.text)
-    voice = texttospeech.VoiceSelectionParams(language_code="en-US", name="en-US-Studio-O")
-    audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.LINEAR16, sample_rate_hertz=24000)
-    tts_response = tts_client.synthesize_speech(input=synth_input, voice=voice, audio_config=audio_config)
-    wav_data = create_wav(tts_response.audio_content)
+    try:
+        audio_content = await run_blocking(synthesize_speech, req.text, timeout=TTS_TIMEOUT_SECONDS)
+    except TimeoutError:
+        raise HTTPException(504, "Speech synthesis timed out.")
+    wav_data = create_wav(audio_content)
     return StreamingResponse(io.BytesIO(wav_data), media_type="audio/wav")
 
+# Conversation sessions: create one, then send its id with each question; delete it to forget the conversation
+@app.post("/api/sessions")
+async def create_session():
+    return {"session_id": sessions.create()}
+
+@app.delete("/api/sessions/{session_id}")
+async def delete_session(session_id: str):
+    if not sessions.delete(session_id):
+        raise HTTPException(404, "Session not found or expired")
+    return {"message": "Session deleted"}
+
 # Health check
 @app.get("/health")
 async def health_check():
     return {"status": "AI Voice FAQ Assistant is running."}
 
+# Prometheus metrics: per-stage latency histograms, request durations, answer sources, cache counters and index size
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Cache hit/miss counters, for tuning ANSWER_CACHE_THRESHOLD
+@app.get("/api/cache-stats")
+async def cache_stats():
+    return {"answers": answer_cache.stats(), "tts": tts_cache.stats()}
+
 # Refresh knowledge base endpoint
 @app.post("/api/refresh")
-async def refresh_knowledge_base():
-    """Manually refresh the knowledge base by reloading all files and rebuilding the index."""
-    success = reload_knowledge_base()
-    if success:
-        return {
-            "message": "Knowledge base refreshed successfully",
-            "faq_count": len(faq_data),
-            "status": "success"
-        }
-    else:
+async def refresh_knowledge_base(full: bool = False, wait: bool = True):
+    """
+    Manually refresh the knowledge base. Only changed files are re-indexed unless `full` is set.
+    The rebuild runs in the background; with `wait` the response is sent once it has finished.
+    """
+    ticket = reload_knowledge_base(full=full)
+    if not wait:
+        return {"message": "Knowledge base refresh scheduled", "status": "scheduled", **index_reloader.status()}
+
+    await run_in_threadpool(index_reloader.wait, ticket)
+    status = index_reloader.status()
+    if status["last_error"]:
         raise HTTPException(500, "Failed to refresh knowledge base")
+    return {
+        "message": "Knowledge base refreshed successfully",
+        "faq_count": status["faq_count"],
+        "generation": status["generation"],
+        "status": "success"
+    }
+
+# Index generation and rebuild progress
+@app.get("/api/index-status")
+async def index_status():
+    return {**index_reloader.status(), "embedding_model": embed_model_info()}
 
 # Dashboard route
 @app.get("/dashboard")
 async def dashboard():
     return FileResponse("static/dashboard.html")
 
-# File upload route
-@app.post("/api/upload-file")
+# Uploads: streamed to a temporary file in data/ in chunks, capped at MAX_UPLOAD_MB, then moved into
+# place atomically so a half-written file is never indexed. Ingestion runs as a background job.
+DATA_DIR = Path("data")
+ALLOWED_UPLOAD_EXTENSIONS = {'.docx', '.pdf', '.txt', '.csv', '.json'}
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", 25)) * 2**20)
+# Bulk uploads and ZIP imports: size of the whole request, and of all files extracted from one archive
+MAX_BULK_UPLOAD_BYTES = int(float(os.getenv("MAX_BULK_UPLOAD_MB", 200)) * 2**20)
+MAX_ZIP_EXTRACTED_BYTES = int(float(os.getenv("MAX_ZIP_EXTRACTED_MB", 500)) * 2**20)
+UPLOAD_CHUNK_BYTES = 1 << 20
+# Request size limits by upload endpoint
+UPLOAD_LIMITS = {
+    "/api/upload-file": MAX_UPLOAD_BYTES,
+    "/api/upload-files": MAX_BULK_UPLOAD_BYTES,
+    "/api/upload-zip": MAX_BULK_UPLOAD_BYTES,
+}
+
+jobs = JobRegistry()
+
+def too_large(max_bytes: int) -> str:
+    return f"File too large. Maximum size is {max_bytes / 2**20:g} MB"
+
+# Caps upload request bodies on the raw ASGI stream, before Starlette spools the multipart body: requests are
+# rejected up front from their Content-Length, and bodies without one (chunked) are cut off once they grow too large
+class UploadSizeLimit:
+    # Room for the multipart boundaries and part headers on top of the file size limit
+    SLACK_BYTES = 64 * 1024
+
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if max_bytes is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length", b"").decode("latin-1")
+        if content_length.isdigit() and int(content_length) > max_bytes + self.SLACK_BYTES:
+            return await JSONResponse({"detail": too_large(max_bytes)}, status_code=413)(scope, receive, send)
+
+        received = 0
+        started = rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes + self.SLACK_BYTES and not started:
+                    # Answer 413 now and stop reading; the app sees a client disconnect and its response is dropped
+                    rejected = True
+                    await JSONResponse({"detail": too_large(max_bytes)}, status_code=413)(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if rejected:
+                return
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+app.add_middleware(UploadSizeLimit, limits=UPLOAD_LIMITS)
+
+# Validates an uploaded file name and keeps only the base name, so uploads can't escape data/
+def upload_filename(name: str) -> str:
+    filename = Path(name or "").name
+    file_extension = Path(filename).suffix.lower()
+    if file_extension not in ALLOWED_UPLOAD_EXTENSIONS:
+        raise HTTPException(400, f"File type {file_extension} not supported. Allowed: {', '.join(ALLOWED_UPLOAD_EXTENSIONS)}")
+    return filename
+
+async def save_upload(file: UploadFile, destination: Path, max_bytes: int = MAX_UPLOAD_BYTES) -> int:
+    """
+    Streams an upload to a temporary file next to `destination` and renames it into place.
+    Raises HTTPException(413) once the upload exceeds `max_bytes`. Returns the size in bytes.
+    """
+    # Not a supported extension, so the index never picks up a partial upload
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=".upload-", suffix=".part")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(413, too_large(max_bytes))
+                await run_in_threadpool(tmp.write, chunk)
+        os.replace(tmp_path, destination)
+        return size
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+def extract_zip(zip_path: Path) -> dict:
+    """
+    Extracts the supported files of a ZIP archive into data/, flattening folders, each written atomically.
+    Members over MAX_UPLOAD_MB and anything past MAX_ZIP_EXTRACTED_MB in total are skipped, so a
+    compression bomb can't fill the disk. Flattening can make names collide: a member named like a file
+    already in data/ is rejected rather than overwriting it, and later members with the same name as an
+    earlier one (e.g. a/faq.txt and b/faq.txt) are saved under a numbered name. Returns {member name: result}.
+    """
+    results = {}
+    extracted = 0
+    existing = {path.name for path in DATA_DIR.iterdir()}
+    taken = set(existing)
+    with zipfile.ZipFile(zip_path) as archive:
+        for member in archive.infolist():
+            name = Path(member.filename).name
+            if member.is_dir() or not name or name.startswith(".") or member.filename.startswith("__MACOSX/"):
+                continue
+            if Path(name).suffix.lower() not in ALLOWED_UPLOAD_EXTENSIONS:
+                results[member.filename] = {"status": "skipped", "error": "unsupported file type"}
+                continue
+            if member.file_size > MAX_UPLOAD_BYTES or extracted + member.file_size > MAX_ZIP_EXTRACTED_BYTES:
+                results[member.filename] = {"status": "rejected", "error": too_large(MAX_UPLOAD_BYTES)}
+                continue
+            if name in existing:
+                results[member.filename] = {
+                    "status": "rejected", "error": f"{name} already exists; delete it first to replace it"
+                }
+                continue
+            original_name = name
+            if name in taken:
+                name = numbered_name(name, taken)
+            taken.add(name)
+
+            fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, prefix=".upload-", suffix=".part")
+            size = 0
+            try:
+                # file_size comes from the archive's own header, so the bytes actually written are capped too
+                with os.fdopen(fd, "wb") as tmp, archive.open(member) as source:
+                    while chunk := source.read(UPLOAD_CHUNK_BYTES):
+                        size += len(chunk)
+                        if size > MAX_UPLOAD_BYTES:
+                            raise ValueError(too_large(MAX_UPLOAD_BYTES))
+                        tmp.write(chunk)
+                os.replace(tmp_path, DATA_DIR / name)
+                extracted += size
+                results[member.filename] = {"status": "saved", "filename": name, "size": size}
+                if name != original_name:
+                    results[member.filename]["renamed_from"] = original_name
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                Path(tmp_path).unlink(missing_ok=True)
+                results[member.filename] = {"status": "rejected", "error": str(e)}
+    return results
+
+# First free "name-2.ext", "name-3.ext", ... for a file name that is already taken
+def numbered_name(name: str, taken: set) -> str:
+    path = Path(name)
+    number = 2
+    while (candidate := f"{path.stem}-{number}{path.suffix}") in taken:
+        number += 1
+    return candidate
+
+# Per-file indexing results, read from the knowledge base after its refresh
+def file_results(filenames: list) -> dict:
+    results = {}
+    for filename in filenames:
+        entry = knowledge_base.files.get(os.path.join(knowledge_base.data_dir, filename))
+        results[filename] = {
+            "indexed": entry is not None,
+            "faq_count": entry["faq_count"] if entry else 0,
+            "error": entry.get("error") if entry else None
+        }
+    return results
+
+# Starts one background reindex for all changed files and tracks it as a job.
+# `filenames` are the files whose parse results are reported when it completes.
+def start_ingestion_job(kind: str, filenames: list, **details) -> dict:
+    job = jobs.create(kind, files=filenames, **details)
+
+    def on_done(summary, error):
+        if error:
+            jobs.update(job["id"], state="failed", error=error)
+        else:
+            jobs.update(job["id"], state="completed", summary=summary, results=file_results(filenames))
+
+    jobs.update(job["id"], state="running")
+    reload_knowledge_base(on_done=on_done)
+    return job
+
+# File upload route: returns a job id immediately, indexing continues in the background
+@app.post("/api/upload-file", status_code=202)
 async def upload_file(file: UploadFile = File(...)):
-    # Validate file type
-    allowed_extensions = {'.docx', '.pdf', '.txt', '.csv', '.json'}
-    file_extension = Path(file.filename).suffix.lower()
-    
-    if file_extension not in allowed_extensions:
-        raise HTTPException(400, f"File type {file_extension} not supported. Allowed: {', '.join(allowed_extensions)}")
+    filename = upload_filename(file.filename)
     
     # Create data directory if it doesn't exist
-    data_dir = Path("data")
-    data_dir.mkdir(exist_ok=True)
-    
-    # Save file to data directory
-    file_path = data_dir / file.filename
+    DATA_DIR.mkdir(exist_ok=True)
     
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Reload FAQs and rebuild index with new file
-        reload_knowledge_base()
-        
-        return {
-            "message": "File uploaded successfully",
-            "filename": file.filename,
-            "size": file_path.stat().st_size
-        }
+        size = await save_upload(file, DATA_DIR / filename)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"File upload error: {e}")
         raise HTTPException(500, "Failed to upload file")
 
+    job = start_ingestion_job("upload", [filename])
+    return {
+        "message": "File uploaded successfully",
+        "filename": filename,
+        "size": size,
+        "job_id": job["id"],
+        "status_url": f"/api/jobs/{job['id']}"
+    }
+
+# Bulk upload: saves every file first, then runs a single incremental reindex for all of them.
+# Files that fail validation are reported and skipped without failing the others. As with a single upload, a
+# file replaces the one of the same name in data/, but a name repeated within the request is saved under a
+# numbered name (as in ZIP imports) rather than overwriting the earlier file; its result is keyed the same way.
+@app.post("/api/upload-files", status_code=202)
+async def upload_files(files: list[UploadFile] = File(...)):
+    DATA_DIR.mkdir(exist_ok=True)
+    existing = {path.name for path in DATA_DIR.iterdir()}
+    taken = set()
+    results = {}
+    saved = []
+    for file in files:
+        key = numbered_name(file.filename, set(results)) if file.filename in results else file.filename
+        try:
+            name = upload_filename(file.filename)
+            filename = numbered_name(name, taken | existing) if name in taken else name
+            taken.add(filename)
+            size = await save_upload(file, DATA_DIR / filename)
+            results[key] = {"status": "saved", "filename": filename, "size": size}
+            if filename != name:
+                results[key]["renamed_from"] = name
+            saved.append(filename)
+        except HTTPException as e:
+            results[key] = {"status": "rejected", "error": e.detail}
+        except Exception as e:
+            logger.error(f"File upload error for {file.filename}: {e}")
+            results[key] = {"status": "rejected", "error": "Failed to upload file"}
+
+    if not saved:
+        raise HTTPException(400, {"message": "No files were saved", "files": results})
+    job = start_ingestion_job("bulk-upload", saved, uploads=results)
+    return {
+        "message": f"{len(saved)} of {len(files)} files uploaded",
+        "files": results,
+        "job_id": job["id"],
+        "status_url": f"/api/jobs/{job['id']}"
+    }
+
+# ZIP import: extracts the supported files of an archive into data/, then runs a single reindex
+@app.post("/api/upload-zip", status_code=202)
+async def upload_zip(file: UploadFile = File(...)):
+    if Path(file.filename or "").suffix.lower() != ".zip":
+        raise HTTPException(400, "Expected a .zip archive")
+    DATA_DIR.mkdir(exist_ok=True)
+
+    # The archive itself is staged outside data/ and removed once extracted
+    with tempfile.TemporaryDirectory() as staging_dir:
+        zip_path = Path(staging_dir) / "upload.zip"
+        await save_upload(file, zip_path, max_bytes=MAX_BULK_UPLOAD_BYTES)
+        try:
+            results = await run_in_threadpool(extract_zip, zip_path)
+        except zipfile.BadZipFile:
+            raise HTTPException(400, "Not a valid ZIP archive")
+
+    saved = [result["filename"] for result in results.values() if result["status"] == "saved"]
+    if not saved:
+        raise HTTPException(400, {"message": "No supported files in the archive", "files": results})
+    job = start_ingestion_job("zip-import", saved, uploads=results)
+    return {
+        "message": f"{len(saved)} files extracted from {file.filename}",
+        "files": results,
+        "job_id": job["id"],
+        "status_url": f"/api/jobs/{job['id']}"
+    }
+
+# Background job status, with the reindex progress while it runs
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    if job["state"] == "running":
+        job["progress"] = index_reloader.status().get("progress", {})
+    return job
+
+# Files the file management API lists and deletes: not hidden ones, which include uploads still being written
+def is_managed_file(file_path: Path) -> bool:
+    return file_path.is_file() and not file_path.name.startswith(".") and file_path.suffix != ".part"
+
 # Get list of uploaded files
 @app.get("/api/files")
 async def list_files():
@@ -276,7 +977,7 @@ async def list_files():
     
     files = []
     for file_path in data_dir.iterdir():
-        if file_path.is_file():
+        if is_managed_file(file_path):
             files.append({
                 "name": file_path.name,
                 "size": file_path.stat().st_size,
@@ -292,20 +993,51 @@ async def delete_file(filename: str):
     data_dir = Path("data")
     file_path = data_dir / filename
     
-    if not file_path.exists():
+    if not is_managed_file(file_path):
         raise HTTPException(404, "File not found")
     
     try:
         file_path.unlink()
         
-        # Reload FAQs and rebuild index after deletion
+        # Reload FAQs and update the index in the background
         reload_knowledge_base()
         
-        return {"message": f"File {filename} deleted successfully"}
+        return {"message": f"File {filename} deleted successfully", "reload": "scheduled"}
     except Exception as e:
         logger.error(f"File deletion error: {e}")
         raise HTTPException(500, "Failed to delete file")
 
+class DeleteFilesRequest(BaseModel):
+    filenames: list[str]
+
+# Batch delete: removes every listed file first, then runs a single reindex
+@app.post("/api/files/delete", status_code=202)
+async def delete_files(request: DeleteFilesRequest):
+    results = {}
+    deleted = []
+    for name in request.filenames:
+        file_path = DATA_DIR / Path(name).name
+        if not is_managed_file(file_path):
+            results[name] = {"status": "not found"}
+            continue
+        try:
+            file_path.unlink()
+            results[name] = {"status": "deleted"}
+            deleted.append(file_path.name)
+        except OSError as e:
+            logger.error(f"File deletion error for {name}: {e}")
+            results[name] = {"status": "error", "error": "Failed to delete file"}
+
+    if not deleted:
+        raise HTTPException(404, {"message": "No files were deleted", "files": results})
+    job = start_ingestion_job("batch-delete", deleted, deletions=results)
+    return {
+        "message": f"{len(deleted)} of {len(request.filenames)} files deleted",
+        "files": results,
+        "job_id": job["id"],
+        "status_url": f"/api/jobs/{job['id']}"
+    }
+
 # Local dev run
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,85 @@
+"""
+Load benchmark: blocking client calls inside async handlers vs. offloaded to the bounded pool.
+
+Both endpoints call the same stubbed remote client, which sleeps to simulate STT/TTS/Gemini latency.
+Run from the repo root:
+
+    python -m benchmarks.bench_blocking_calls --requests 200 --concurrency 50 --latency 0.2
+"""
+import time
+import asyncio
+import argparse
+
+import httpx
+from fastapi import FastAPI
+
+from utils.concurrency import run_blocking, MAX_BLOCKING_WORKERS
+
+
+class StubRemoteClient:
+    """Stands in for a synchronous Google client: blocks the calling thread for `latency` seconds."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def call(self, text):
+        time.sleep(self.latency)
+        return text.upper()
+
+
+def make_app(client):
+    app = FastAPI()
+
+    @app.post("/blocking")
+    async def blocking(payload: dict):
+        return {"answer": client.call(payload["text"])}
+
+    @app.post("/offloaded")
+    async def offloaded(payload: dict):
+        return {"answer": await run_blocking(client.call, payload["text"], timeout=30)}
+
+    return app
+
+
+async def run_load(app, path, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        async def one(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await http.post(path, json={"text": f"question {i}"})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated remote call latency in seconds")
+    args = parser.parse_args()
+
+    app = make_app(StubRemoteClient(args.latency))
+    print(f"pool size: {MAX_BLOCKING_WORKERS}, concurrency: {args.concurrency}, latency: {args.latency}s")
+    for path in ("/blocking", "/offloaded"):
+        print(asyncio.run(run_load(app, path, args.requests, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
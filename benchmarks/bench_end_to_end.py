@@ -0,0 +1,457 @@
+"""
+End-to-end benchmark: the FastAPI app in-process on a synthetic corpus, with fake Google STT/TTS clients
+and the fake LLM backend (core.llm_client) standing in for Gemini, each with a configurable latency.
+
+A corpus of --files-per-format files with --faqs-per-file entries each is generated in DOCX, PDF, CSV,
+JSON and TXT. Every measurement runs in a fresh subprocess in a temporary working directory:
+- cold start: importing api.main with no persisted index (parse + embed everything), then with one
+- full and incremental index builds (one changed file)
+- retrieval: query embedding and hybrid retrieval latency, p50/p99
+- /api/ask-text and /api/ask-audio throughput and latency under concurrency
+- peak RSS of each process
+Answer and TTS caches are disabled unless --caches is given, so every request runs the whole pipeline.
+Results are printed and, with --output, written as JSON to compare runs (e.g. in CI). Run from the repo root:
+
+    python -m benchmarks.bench_end_to_end --files-per-format 4 --faqs-per-file 50 --output results.json
+
+--fake-embeddings swaps the embedding model for a deterministic hashing embedding, for machines without
+the model (or to measure everything but the model).
+"""
+import os
+import sys
+import csv
+import json
+import zlib
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORMATS = ("docx", "pdf", "csv", "json", "txt")
+
+VERBS = ["request", "update", "cancel", "renew", "transfer", "review", "approve", "report", "reset", "extend"]
+NOUNS = ["leave", "laptop", "badge", "expense claim", "training budget", "parking permit", "password",
+         "benefits enrollment", "travel booking", "mentorship slot", "certification", "desk booking"]
+TEAMS = ["engineering", "sales", "finance", "support", "design", "marketing", "operations", "legal"]
+
+
+# ---------------------------------------------------------------- synthetic corpus
+
+def faq_entry(file_index, i):
+    rng = random.Random(file_index * 100003 + i)
+    verb, noun, team = rng.choice(VERBS), rng.choice(NOUNS), rng.choice(TEAMS)
+    question = f"How do I {verb} my {noun} in {team} (case {file_index}-{i})?"
+    answer = (
+        f"To {verb} your {noun}, {team} employees open the HR portal and choose {noun.title()}. "
+        f"Requests for case {file_index}-{i} are reviewed by the {team} lead within {rng.randint(1, 9)} business days. "
+        f"Approved changes are recorded in the portal and you get an email confirmation."
+    )
+    return {"question": question, "answer": answer, "verb": verb, "noun": noun, "team": team,
+            "section": f"{team.title()} {noun.title()} Policies"}
+
+
+def corpus_entries(file_index, faqs_per_file):
+    return [faq_entry(file_index, i) for i in range(faqs_per_file)]
+
+
+def blocks(entries):
+    """Document blocks as (text, is_heading): a heading every 10 entries, then question and answer paragraphs."""
+    for i, entry in enumerate(entries):
+        if i % 10 == 0:
+            yield entry["section"], True
+        yield entry["question"], False
+        yield entry["answer"], False
+
+
+def write_docx(path, entries):
+    from docx import Document
+
+    doc = Document()
+    for text, is_heading in blocks(entries):
+        if is_heading:
+            doc.add_heading(text, level=1)
+        else:
+            doc.add_paragraph(text)
+    doc.save(path)
+
+
+def write_pdf(path, entries):
+    import fitz
+
+    doc = fitz.open()
+    page, y = None, 0
+    for text, is_heading in blocks(entries):
+        height = 30 if is_heading else 60
+        if page is None or y + height > 790:
+            page, y = doc.new_page(), 50
+        page.insert_textbox(fitz.Rect(50, y, 550, y + height), text, fontsize=16 if is_heading else 9)
+        y += height + 4
+    doc.save(path)
+    doc.close()
+
+
+def write_csv(path, entries):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["question", "answer"])
+        writer.writeheader()
+        writer.writerows({"question": e["question"], "answer": e["answer"]} for e in entries)
+
+
+def write_json(path, entries):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"question": e["question"], "answer": e["answer"]} for e in entries], f)
+
+
+def write_txt(path, entries):
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(f"{entry['question']}\n{entry['answer']}\n\n")
+
+
+WRITERS = {"docx": write_docx, "pdf": write_pdf, "csv": write_csv, "json": write_json, "txt": write_txt}
+
+
+def generate_corpus(data_dir, formats, files_per_format, faqs_per_file):
+    """Writes the corpus; returns the entries, for building queries."""
+    os.makedirs(data_dir, exist_ok=True)
+    all_entries = []
+    for f, fmt in enumerate(formats):
+        for n in range(files_per_format):
+            file_index = f * files_per_format + n
+            entries = corpus_entries(file_index, faqs_per_file)
+            WRITERS[fmt](os.path.join(data_dir, f"faq_{file_index:03d}.{fmt}"), entries)
+            all_entries.extend(entries)
+    return all_entries
+
+
+def make_queries(entries, count, off_topic_rate=0.1, seed=0):
+    """Paraphrased questions about corpus entries, plus a fraction of off-topic ones."""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        if rng.random() < off_topic_rate:
+            queries.append(f"What is the weather like on planet {rng.randint(1, 10**6)}")
+            continue
+        entry = rng.choice(entries)
+        queries.append(f"who reviews a {entry['noun']} {entry['verb']} for {entry['team']} people, and how long does it take")
+    return queries
+
+
+# ---------------------------------------------------------------- fakes
+
+class FakeSpeechClient:
+    """google.cloud.speech.SpeechClient stand-in: the "audio" is the question text, returned after `latency` seconds."""
+
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def recognize(self, config=None, audio=None, timeout=None):
+        time.sleep(self.latency)
+        alternative = SimpleNamespace(transcript=audio.content.decode("utf-8", errors="ignore"))
+        return SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative])])
+
+
+class FakeTextToSpeechClient:
+    """google.cloud.texttospeech.TextToSpeechClient stand-in: silent LINEAR16 audio, ~60ms per character."""
+
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def synthesize_speech(self, input=None, voice=None, audio_config=None, timeout=None):
+        time.sleep(self.latency)
+        return SimpleNamespace(audio_content=bytes(2 * 24000 * 6 * len(input.text) // 100))
+
+
+def hashing_embedding_class():
+    from llama_index.core.embeddings import BaseEmbedding
+    import numpy as np
+
+    class HashingEmbedding(BaseEmbedding):
+        """Deterministic bag-of-words embedding (signed feature hashing), 384 dimensions."""
+
+        def _embed(self, text):
+            vector = np.zeros(384, dtype=np.float32)
+            for word in text.lower().split():
+                digest = zlib.crc32(word.strip(".,?!()").encode("utf-8"))
+                vector[digest % 384] += 1 if digest & 1 << 20 else -1
+            norm = np.linalg.norm(vector)
+            return (vector / norm if norm else vector).tolist()
+
+        def _get_query_embedding(self, query):
+            return self._embed(query)
+
+        def _get_text_embedding(self, text):
+            return self._embed(text)
+
+        async def _aget_query_embedding(self, query):
+            return self._embed(query)
+
+    return HashingEmbedding
+
+
+def install_fakes(config):
+    """Must run before api.main is imported: it creates its Google clients and builds the index at import time."""
+    from google.cloud import speech, texttospeech
+
+    FakeSpeechClient.latency = config["stt_latency"]
+    FakeTextToSpeechClient.latency = config["tts_latency"]
+    speech.SpeechClient = FakeSpeechClient
+    texttospeech.TextToSpeechClient = FakeTextToSpeechClient
+
+    if config["fake_embeddings"]:
+        import core.embeddings
+
+        embedding_class = hashing_embedding_class()
+        core.embeddings._load_embed_model = lambda: embedding_class(model_name="hashing", embed_batch_size=64)
+
+
+def child_environment(config):
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")])),
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_SECONDS": str(config["llm_latency"]),
+        "FAKE_LLM_FAILURE_RATE": "0",
+        "RATE_LIMIT_ASK": "1000000/1",
+        "RATE_LIMIT_TTS": "1000000/1",
+        "RATE_LIMIT_TRANSCRIBE": "1000000/1",
+        "INDEX_DIR": "index_store",
+    })
+    if not config["caches"]:
+        env.update({"ANSWER_CACHE_SIZE": "0", "TTS_CACHE_SIZE": "0"})
+    return env
+
+
+# ---------------------------------------------------------------- measurements (child processes)
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {}
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+    }
+
+
+def import_app(config):
+    import logging
+
+    logging.disable(logging.INFO)
+    install_fakes(config)
+    start = time.perf_counter()
+    import api.main as app_module
+    return app_module, time.perf_counter() - start
+
+
+def measure_start(config):
+    from utils.memory import peak_rss_bytes
+
+    app_module, seconds = import_app(config)
+    return {
+        "import_seconds": round(seconds, 3),
+        "node_count": len(app_module.knowledge_base.nodes),
+        "faq_count": app_module.knowledge_base.faq_count,
+        "peak_rss_mb": round(peak_rss_bytes() / 2**20, 1),
+    }
+
+
+def measure_builds(app_module):
+    knowledge_base = app_module.knowledge_base
+    results = {}
+
+    start = time.perf_counter()
+    summary = knowledge_base.refresh(full=True)
+    results["full_build"] = {"seconds": round(time.perf_counter() - start, 3), **summary}
+
+    # Incremental: one file gains an entry
+    path = next(os.path.join("data", name) for name in sorted(os.listdir("data")) if name.endswith(".txt") or name.endswith(".csv"))
+    entry = faq_entry(10**6, 0)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"\n{entry['question']}\n{entry['answer']}\n" if path.endswith(".txt") else f'"{entry["question"]}","{entry["answer"]}"\n')
+    start = time.perf_counter()
+    summary = knowledge_base.refresh()
+    results["incremental_build"] = {"seconds": round(time.perf_counter() - start, 3), **summary}
+
+    start = time.perf_counter()
+    summary = knowledge_base.refresh()
+    results["noop_refresh"] = {"seconds": round(time.perf_counter() - start, 3), **summary}
+    return results
+
+
+def measure_retrieval(app_module, queries):
+    embed, retrieve = [], []
+    for query in queries:
+        start = time.perf_counter()
+        embedding = app_module.knowledge_base.embed_query(query)
+        embed.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        app_module.retrieve_context(query, embedding)
+        retrieve.append(time.perf_counter() - start)
+    return {"queries": len(queries), "embed": summarize(embed), "retrieve": summarize(retrieve)}
+
+
+async def run_load(app, path, bodies, concurrency):
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as http:
+        async def one(body):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await http.post(path, **body)
+                if response.status_code != 200:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(body) for body in bodies))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(bodies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(bodies) / elapsed, 2),
+        **summarize(latencies),
+    }
+
+
+def measure_load(app_module, queries, concurrency):
+    from core.metrics import ANSWERS, PROMPT_TOKENS
+
+    text = [{"json": {"text": query}} for query in queries]
+    audio = [{"files": {"file": ("question.webm", query.encode("utf-8"), "audio/webm")}} for query in queries]
+    results = {
+        "ask_text": asyncio.run(run_load(app_module.app, "/api/ask-text", text, concurrency)),
+        "ask_audio": asyncio.run(run_load(app_module.app, "/api/ask-audio", audio, concurrency)),
+    }
+    results["answers_by_source"] = {labels[0]: count for labels, count in ANSWERS.snapshot().items()}
+    results["mean_prompt_tokens"] = {
+        labels[0]: round(total / count, 1) for labels, (total, count) in PROMPT_TOKENS.snapshot().items() if count
+    }
+    return results
+
+
+def measure_run(config, queries):
+    from utils.memory import peak_rss_bytes
+
+    app_module, seconds = import_app(config)
+    results = {"import_seconds": round(seconds, 3)}
+    results["builds"] = measure_builds(app_module)
+    results["retrieval"] = measure_retrieval(app_module, queries[: config["retrieval_queries"]])
+    results["load"] = measure_load(app_module, queries[: config["requests"]], config["concurrency"])
+    results["peak_rss_mb"] = round(peak_rss_bytes() / 2**20, 1)
+    return results
+
+
+def child(mode, config_path):
+    with open(config_path, encoding="utf-8") as f:
+        config = json.load(f)
+    if mode == "start":
+        result = measure_start(config)
+    else:
+        result = measure_run(config, config["queries"])
+    print("RESULT " + json.dumps(result))
+
+
+def run_child(mode, config_path, workdir, env):
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_end_to_end", "--child", mode, config_path],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("RESULT ")]
+    if completed.returncode != 0 or not lines:
+        raise RuntimeError(f"Benchmark step '{mode}' failed:\n{completed.stderr[-4000:]}")
+    return {"wall_seconds": round(wall, 3), **json.loads(lines[-1][len("RESULT "):])}
+
+
+# ---------------------------------------------------------------- driver
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--files-per-format", type=int, default=4)
+    parser.add_argument("--faqs-per-file", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint in the load test")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--retrieval-queries", type=int, default=200)
+    parser.add_argument("--stt-latency", type=float, default=0.3, help="fake speech-to-text latency in seconds")
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="fake text-to-speech latency in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="fake Gemini latency in seconds")
+    parser.add_argument("--caches", action="store_true", help="keep the answer and TTS caches enabled")
+    parser.add_argument("--fake-embeddings", action="store_true", help="use a hashing embedding instead of the model")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "CONFIG"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    with tempfile.TemporaryDirectory() as workdir:
+        shutil.copytree(os.path.join(REPO_ROOT, "static"), os.path.join(workdir, "static"))
+        start = time.perf_counter()
+        entries = generate_corpus(os.path.join(workdir, "data"), formats, args.files_per_format, args.faqs_per_file)
+        corpus_seconds = time.perf_counter() - start
+
+        config = {
+            "formats": formats,
+            "files_per_format": args.files_per_format,
+            "faqs_per_file": args.faqs_per_file,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "retrieval_queries": args.retrieval_queries,
+            "stt_latency": args.stt_latency,
+            "tts_latency": args.tts_latency,
+            "llm_latency": args.llm_latency,
+            "caches": args.caches,
+            "fake_embeddings": args.fake_embeddings,
+        }
+        config_path = os.path.join(workdir, "config.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({**config, "queries": make_queries(entries, max(args.requests, args.retrieval_queries))}, f)
+
+        env = child_environment(config)
+        results = {
+            "config": config,
+            "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "corpus": {
+                "files": len(formats) * args.files_per_format,
+                "faqs": len(entries),
+                "bytes": sum(entry.stat().st_size for entry in os.scandir(os.path.join(workdir, "data"))),
+                "generate_seconds": round(corpus_seconds, 3),
+            },
+        }
+        # Index from scratch, then from the index persisted by the first start
+        results["cold_start"] = run_child("start", config_path, workdir, env)
+        results["warm_start"] = run_child("start", config_path, workdir, env)
+        results["run"] = run_child("run", config_path, workdir, env)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
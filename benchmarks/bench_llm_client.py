@@ -0,0 +1,68 @@
+"""
+Latency benchmark: core.llm_client.LLMClient on the fake backend with a latency tail and transient
+errors, without and with hedged requests, from concurrent callers.
+
+Each request takes --latency seconds, except a --slow-rate fraction that take --slow-latency, and a
+--failure-rate fraction that fail with a 503 and are retried. Reports latency percentiles, failed calls
+and how many backend requests were sent. Run from the repo root:
+
+    python -m benchmarks.bench_llm_client --calls 200 --concurrency 8 --hedge-after 0.3
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from core.llm_client import LLMClient, LLMError, FakeLLMBackend
+
+
+def percentile(latencies, p):
+    return latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+
+
+def run(args, hedge_after):
+    backend = FakeLLMBackend(
+        latency=args.latency, jitter=args.latency / 2, failure_rate=args.failure_rate,
+        slow_rate=args.slow_rate, slow_latency=args.slow_latency, seed=0,
+    )
+    client = LLMClient(backend, timeout=args.timeout, backoff_base=0.05, hedge_after=hedge_after,
+                       max_workers=2 * args.concurrency)
+
+    def call(_):
+        start = time.perf_counter()
+        try:
+            client.generate("--- RAW FAQ ANSWER ---\nAnswer.\n---")
+            return time.perf_counter() - start, False
+        except LLMError:
+            return time.perf_counter() - start, True
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(call, range(args.calls)))
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        "hedge_after": hedge_after,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000),
+        "failed": sum(failed for _, failed in results),
+        **client.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--hedge-after", type=float, default=0.4)
+    args = parser.parse_args()
+
+    for hedge_after in (0, args.hedge_after):
+        print(run(args, hedge_after))
+
+
+if __name__ == "__main__":
+    main()
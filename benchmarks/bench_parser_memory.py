@@ -0,0 +1,124 @@
+"""
+Memory benchmark: peak memory of parsing large synthetic PDF and DOCX handbooks with the streaming
+parsers in core.file_parser vs. the previous approach (python-docx document tree / every PDF line in
+one list, then extraction).
+
+Each parse runs in a fresh subprocess and reports its peak RSS above the baseline after imports.
+The streaming run consumes entries as they are yielded, the way the indexer does. Run from the repo root:
+
+    python -m benchmarks.bench_parser_memory --pages 50,200,500
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+PARAGRAPHS_PER_PAGE = 12
+
+
+def page_paragraphs(page):
+    """Synthetic handbook page: a section heading and a few Q&A entries."""
+    yield f"Section {page}: Policies", True
+    for i in range(PARAGRAPHS_PER_PAGE // 3):
+        yield f"What is policy {page}-{i}?", False
+        yield (
+            f"Policy {page}-{i} covers how employees request leave, travel and equipment. "
+            "Requests are reviewed by the team lead within five business days, and approved requests are "
+            "recorded in the HR portal along with any supporting documents. " * 2
+        ), False
+
+
+def make_docx(path, pages):
+    from docx import Document
+
+    doc = Document()
+    for page in range(pages):
+        for text, is_heading in page_paragraphs(page):
+            if is_heading:
+                doc.add_heading(text, level=1)
+            else:
+                doc.add_paragraph(text)
+        doc.add_page_break()
+    doc.save(path)
+
+
+def make_pdf(path, pages):
+    import fitz
+
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        y = 60
+        for text, is_heading in page_paragraphs(page_number):
+            box = fitz.Rect(50, y, 550, y + (30 if is_heading else 80))
+            page.insert_textbox(box, text, fontsize=16 if is_heading else 9)
+            y += 34 if is_heading else 84
+    doc.save(path)
+    doc.close()
+
+
+def legacy_blocks(path):
+    """Blocks the way the parsers used to collect them: all at once, before extraction."""
+    if path.endswith(".docx"):
+        from docx import Document
+
+        doc = Document(path)
+        return [(para.text, para.style.name.startswith("Heading")) for para in doc.paragraphs if para.text.strip()]
+    import fitz
+
+    doc = fitz.open(path)
+    lines = []
+    for page in doc:
+        lines.extend(page.get_text().split("\n"))
+    return [(line, False) for line in lines]
+
+
+def child(mode, path):
+    from core.file_parser import extract_faq_pairs, iter_file_faq_pairs
+    from core.chunker import chunk_faq_pairs
+    from utils.memory import current_rss_bytes, peak_rss_bytes
+
+    baseline = current_rss_bytes()
+    if mode == "legacy":
+        entries = len(extract_faq_pairs(legacy_blocks(path), path))
+    else:
+        entries = sum(1 for _ in chunk_faq_pairs(iter_file_faq_pairs(path)))
+    print(json.dumps({"entries": entries, "peak_mb": round((peak_rss_bytes() - baseline) / 2**20, 1)}))
+
+
+def measure(mode, path):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_parser_memory", "--child", mode, path],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="50,200,500", help="comma-separated page counts")
+    parser.add_argument("--formats", default="pdf,docx")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    # Keep the child processes quiet and off the embedding model; the chunker falls back to word counts
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in (int(pages) for pages in args.pages.split(",")):
+            for fmt in args.formats.split(","):
+                path = os.path.join(tmp, f"handbook_{pages}.{fmt}")
+                (make_pdf if fmt == "pdf" else make_docx)(path, pages)
+                result = {"format": fmt, "pages": pages, "file_mb": round(os.path.getsize(path) / 2**20, 2)}
+                for mode in ("legacy", "streaming"):
+                    result[mode] = measure(mode, path)
+                print(result)
+
+
+if __name__ == "__main__":
+    main()
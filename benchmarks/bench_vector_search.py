@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: top-k vector search with core.vector_index.VectorIndex vs. LlamaIndex's default
+in-memory vector store (the VectorStoreIndex path the knowledge base used before).
+
+Nodes are synthetic random unit vectors, so only search cost is measured. The baseline builds real
+TextNodes and is skipped above --baseline-max nodes, where it gets too slow and memory hungry.
+Run from the repo root:
+
+    python -m benchmarks.bench_vector_search --sizes 10000,100000,1000000 --dim 384 --queries 50
+
+A 1M x 384 float32 matrix takes about 1.5 GB; use --dtype float16 to halve it.
+"""
+import time
+import argparse
+
+import numpy as np
+from llama_index.core import VectorStoreIndex
+from llama_index.core.schema import TextNode, QueryBundle
+from llama_index.core.embeddings import MockEmbedding
+
+from core.vector_index import VectorIndex
+
+
+def timed(func, repeat):
+    """Returns (result of the last call, per-call latencies in seconds)."""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - start)
+    return result, latencies
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000, 3),
+    }
+
+
+def bench_size(size, args, rng):
+    vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    node_ids = [f"node-{i}" for i in range(size)]
+    metadata = [{"source": f"file-{i % args.sources}.pdf"} for i in range(size)]
+    result = {"nodes": size, "dim": args.dim, "dtype": args.dtype}
+
+    start = time.perf_counter()
+    index = VectorIndex(node_ids, vectors, metadata, dtype=args.dtype)
+    result["build_s"] = round(time.perf_counter() - start, 3)
+    result["matrix_mb"] = round(index.matrix.nbytes / 2**20, 1)
+
+    query_iter = iter(np.tile(queries, (2, 1)))
+    _, latencies = timed(lambda: index.search(next(query_iter), args.top_k), args.queries)
+    result["single"] = summarize(latencies)
+
+    _, latencies = timed(lambda: index.search_batch(queries, args.top_k), 3)
+    result["batch_per_query_ms"] = round(min(latencies) / args.queries * 1000, 3)
+
+    query_iter = iter(np.tile(queries, (2, 1)))
+    _, latencies = timed(lambda: index.search(next(query_iter), args.top_k, {"source": "file-0.pdf"}), args.queries)
+    result["filtered"] = summarize(latencies)
+
+    if size <= args.baseline_max:
+        nodes = [
+            TextNode(id_=node_id, text="", metadata=meta, embedding=vector.tolist())
+            for node_id, meta, vector in zip(node_ids, metadata, vectors)
+        ]
+        start = time.perf_counter()
+        baseline = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=args.dim))
+        result["baseline_build_s"] = round(time.perf_counter() - start, 3)
+        retriever = baseline.as_retriever(similarity_top_k=args.top_k)
+
+        runs = min(args.queries, args.baseline_queries)
+        query_iter = iter(queries.tolist())
+        _, latencies = timed(lambda: retriever.retrieve(QueryBundle("", embedding=next(query_iter))), runs)
+        result["baseline_single"] = summarize(latencies)
+        result["speedup_p50"] = round(result["baseline_single"]["p50_ms"] / max(result["single"]["p50_ms"], 1e-6), 1)
+
+        # Same top hit for the same query
+        expected = index.search(queries[0], 1)[0][0]
+        actual = retriever.retrieve(QueryBundle("", embedding=queries[0].tolist()))[0].node.node_id
+        result["same_top_hit"] = expected == actual
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated node counts")
+    parser.add_argument("--dim", type=int, default=384, help="embedding size (bge-small is 384)")
+    parser.add_argument("--dtype", default="float32", choices=("float32", "float16"))
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--sources", type=int, default=20, help="distinct source files, for the filtered search")
+    parser.add_argument("--baseline-max", type=int, default=100000, help="largest size to run the baseline on")
+    parser.add_argument("--baseline-queries", type=int, default=10, help="queries to time on the baseline")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for size in (int(size) for size in args.sizes.split(",")):
+        print(bench_size(size, args, rng))
+
+
+if __name__ == "__main__":
+    main()
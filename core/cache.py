@@ -0,0 +1,168 @@
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class TTLCache:
+    """
+    Exact-match cache with LRU eviction and a per-entry time to live. Thread-safe.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by query embedding.
+
+    A lookup hits when a cached query has cosine similarity of at least `threshold` with the new one and
+    was answered against the same index generation. Entries expire after `ttl_seconds` and the least
+    recently used ones are evicted beyond `max_entries`. Thread-safe.
+    """
+
+    def __init__(self, threshold=0.95, max_entries=1000, ttl_seconds=3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # query text -> row, in LRU order
+        # One row per entry, updated in place by `put` and eviction so lookups don't rebuild the matrix;
+        # rows of removed entries are reused
+        self._vectors = None  # unit query vectors, allocated on the first put and grown by doubling
+        self._expires = np.zeros(0)
+        self._generations = np.zeros(0, dtype=np.int64)
+        self._used = np.zeros(0, dtype=bool)
+        self._keys = []
+        self._answers = []
+        self._free = []
+        self._size = 0  # rows handed out so far
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remove(self, row):
+        del self._entries[self._keys[row]]
+        self._used[row] = False
+        self._keys[row] = self._answers[row] = None
+        self._free.append(row)
+
+    def _new_row(self, dim):
+        if self._free:
+            return self._free.pop()
+        if self._vectors is None or self._size == len(self._vectors):
+            capacity = min(max(2 * self._size, 64), self.max_entries)
+            vectors = np.zeros((capacity, dim), dtype=np.float32)
+            if self._vectors is not None:
+                vectors[:self._size] = self._vectors
+            self._vectors = vectors
+            self._expires = np.resize(self._expires, capacity)
+            self._generations = np.resize(self._generations, capacity)
+            self._used = np.concatenate([self._used, np.zeros(capacity - len(self._used), dtype=bool)])
+            self._keys.extend([None] * (capacity - len(self._keys)))
+            self._answers.extend([None] * (capacity - len(self._answers)))
+        self._size += 1
+        return self._size - 1
+
+    def get(self, embedding, generation, count=True):
+        """
+        Returns the cached answer for the most similar query above the threshold, or None.
+        With `count=False` the lookup isn't counted as a hit or miss (see `record`).
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._entries:
+                size = self._size
+                used = self._used[:size]
+                live = used & (self._expires[:size] >= time.monotonic()) & (self._generations[:size] == generation)
+                # Expired entries and those answered against another index generation are dropped
+                for row in np.flatnonzero(used & ~live):
+                    self._remove(row)
+                if live.any():
+                    similarities = np.where(live, self._vectors[:size] @ query, -np.inf)
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.threshold:
+                        self._entries.move_to_end(self._keys[best])
+                        self.hits += count
+                        return self._answers[best]
+            self.misses += count
+            return None
+
+    def record(self, hit):
+        """
+        Counts a lookup made with `count=False` once it turns out to matter, e.g. a speculative one that was used.
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, query_text, embedding, generation, answer):
+        vector = self._normalize(embedding)
+        with self._lock:
+            row = self._entries.get(query_text)
+            if row is None:
+                if len(self._entries) >= self.max_entries:
+                    self._remove(next(iter(self._entries.values())))
+                row = self._new_row(len(vector))
+                self._entries[query_text] = row
+            self._entries.move_to_end(query_text)
+            self._vectors[row] = vector
+            self._expires[row] = time.monotonic() + self.ttl_seconds
+            self._generations[row] = generation
+            self._used[row] = True
+            self._keys[row] = query_text
+            self._answers[row] = answer
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
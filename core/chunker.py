@@ -0,0 +1,115 @@
+import os
+import re
+import logging
+import threading
+
+from core.embeddings import EMBEDDING_MODEL
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upper bound on the embedded text of one node, in embedding-model tokens (bge-small truncates at 512)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", 256))
+# Room for the metadata LlamaIndex prepends to the embedded text ("question: ...", "source: ...", "section: ...")
+METADATA_TOKEN_OVERHEAD = 16
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+_tokenizer = None
+_tokenizer_loaded = False
+_tokenizer_lock = threading.Lock()
+
+
+def _get_tokenizer():
+    global _tokenizer, _tokenizer_loaded
+    if not _tokenizer_loaded:
+        with _tokenizer_lock:
+            if not _tokenizer_loaded:
+                try:
+                    # Only the tokenizer files are loaded, not the model weights
+                    from transformers import AutoTokenizer
+                    _tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL)
+                except Exception as e:
+                    logger.warning(f"Tokenizer for {EMBEDDING_MODEL} unavailable, estimating token counts from words: {e}")
+                _tokenizer_loaded = True
+    return _tokenizer
+
+
+def count_tokens(text):
+    """
+    Number of embedding-model tokens in `text`, or an estimate of 4 tokens per 3 words without the tokenizer.
+    """
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return -(-len(text.split()) * 4 // 3)
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def _units(text, max_tokens):
+    """
+    Yields (piece, token count, separator) for the largest pieces of `text` that fit in max_tokens:
+    paragraphs, else sentences, else runs of words.
+    """
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        tokens = count_tokens(paragraph)
+        if tokens <= max_tokens:
+            yield paragraph, tokens, "\n\n"
+            continue
+        for sentence in SENTENCE_BOUNDARY.split(paragraph):
+            tokens = count_tokens(sentence)
+            if tokens <= max_tokens:
+                yield sentence, tokens, " "
+                continue
+            words, words_tokens = [], 0
+            for word in sentence.split():
+                word_tokens = count_tokens(word)
+                if words and words_tokens + word_tokens > max_tokens:
+                    yield " ".join(words), words_tokens, " "
+                    words, words_tokens = [], 0
+                words.append(word)
+                words_tokens += word_tokens
+            if words:
+                yield " ".join(words), words_tokens, " "
+
+
+def split_text(text, max_tokens):
+    """
+    Splits text into chunks of at most max_tokens, packing whole paragraphs, then sentences, then words.
+    """
+    chunks, current, current_tokens = [], "", 0
+    for piece, tokens, separator in _units(text, max_tokens):
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = "", 0
+        current = f"{current}{separator}{piece}" if current else piece
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_faq_pairs(faq_pairs, max_tokens=None):
+    """
+    The chunking stage between parsing and indexing: splits each parsed entry so its embedded text
+    (question, section and answer) stays within `max_tokens` embedding-model tokens.
+
+    Entries are dicts with 'question', 'answer' and optionally 'section' (the heading they appeared under);
+    chunks of a long answer keep its question and section. Entries that already fit pass through as they are.
+    Takes and yields entries lazily, so it can sit between a streaming parser and the indexer.
+    """
+    max_tokens = max_tokens or CHUNK_MAX_TOKENS
+    for pair in faq_pairs:
+        question = pair.get("question", "")
+        answer = pair.get("answer", "")
+        # The question is embedded twice: in the node text and in its metadata
+        overhead = 2 * count_tokens(question) + count_tokens(pair.get("section", "")) + METADATA_TOKEN_OVERHEAD
+        budget = max(max_tokens - overhead, max_tokens // 4)
+        if not answer or count_tokens(answer) <= budget:
+            yield pair
+            continue
+        for part in split_text(answer, budget):
+            yield {**pair, "answer": part}
@@ -0,0 +1,191 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.memory import current_rss_bytes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
+# "torch" (default) or "onnx" to run on ONNX Runtime, e.g. with an int8-quantized export for CPU inference
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE")  # e.g. onnx/model_qint8_avx512_vnni.onnx
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", 1))
+
+# Identifies the vectors a model variant produces; persisted indexes and cached embeddings are keyed by it
+EMBEDDING_MODEL_ID = EMBEDDING_MODEL if EMBEDDING_BACKEND == "torch" else f"{EMBEDDING_MODEL}@{EMBEDDING_BACKEND}:{EMBEDDING_ONNX_FILE or 'default'}"
+
+_embed_model = None
+_embed_model_info = {}
+_embed_model_lock = threading.Lock()
+
+
+def _load_embed_model():
+    # Imported lazily so using the cache or config from this module doesn't load torch
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    if EMBEDDING_BACKEND != "torch":
+        backend_kwargs = {"backend": EMBEDDING_BACKEND}
+        if EMBEDDING_ONNX_FILE:
+            backend_kwargs["model_kwargs"] = {"file_name": EMBEDDING_ONNX_FILE}
+        try:
+            return HuggingFaceEmbedding(model_name=EMBEDDING_MODEL, embed_batch_size=EMBED_BATCH_SIZE, **backend_kwargs)
+        except Exception as e:
+            # Needs the optional `optimum[onnxruntime]` package
+            logger.error(f"Could not load {EMBEDDING_MODEL} with the {EMBEDDING_BACKEND} backend: {e}")
+            raise
+    return HuggingFaceEmbedding(model_name=EMBEDDING_MODEL, embed_batch_size=EMBED_BATCH_SIZE)
+
+
+def get_embed_model():
+    """
+    Returns the process-wide embedding model, loading it on first use, and configures
+    LlamaIndex settings for embedding-only retrieval.
+    """
+    global _embed_model
+    # Imported here so the parse workers, which only read EMBEDDING_MODEL from this module, don't load LlamaIndex
+    from llama_index.core.settings import Settings
+
+    if _embed_model is None:
+        with _embed_model_lock:
+            if _embed_model is None:
+                rss_before = current_rss_bytes()
+                start = time.perf_counter()
+                model = _load_embed_model()
+                _embed_model_info.update(
+                    model=EMBEDDING_MODEL_ID,
+                    load_seconds=round(time.perf_counter() - start, 3),
+                    memory_mb=round((current_rss_bytes() - rss_before) / 2**20, 1),
+                )
+                logger.info(
+                    f"Loaded embedding model {EMBEDDING_MODEL_ID} in {_embed_model_info['load_seconds']}s "
+                    f"(+{_embed_model_info['memory_mb']} MB resident)"
+                )
+                Settings.embed_model = model
+                Settings.llm = None  # Disable LLM-based reasoning, just use embedding
+                _embed_model = model
+    return _embed_model
+
+
+def embed_model_info():
+    """
+    Model id, load time and resident memory added by loading it; empty until the model is loaded.
+    """
+    return dict(_embed_model_info)
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache in SQLite, keyed by (model name, SHA-256 of the embedded text).
+    Shared by every rebuild, and by every instance that ships or mounts the same file.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+
+    def get_many(self, model_name, hashes):
+        """
+        Returns {text hash: vector} for the hashes that are cached.
+        """
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model_name, *batch],
+                )
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model_name, items):
+        """
+        Stores (text hash, vector) pairs.
+        """
+        rows = [(model_name, digest, np.asarray(vector, dtype=np.float32).tobytes()) for digest, vector in items]
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)", rows
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                # e.g. a read-only deployment filesystem; the cache is an optimization, not a requirement
+                logger.warning(f"Could not write to embedding cache {self.path}: {e}")
+
+
+def embed_texts(texts, embed_model, model_name, cache=None, batch_size=None, num_threads=None, progress=None):
+    """
+    Embeds texts in batches of `batch_size`, running up to `num_threads` batches at once.
+    Texts already in `cache` are not re-embedded. Returns (vectors in input order, stats).
+    `progress(stage, done, total)` is called as batches complete.
+    """
+    batch_size = batch_size or EMBED_BATCH_SIZE
+    num_threads = num_threads or EMBED_THREADS
+    start_time = time.perf_counter()
+
+    hashes = [text_hash(text) for text in texts]
+    cached = cache.get_many(model_name, set(hashes)) if cache else {}
+
+    # Identical texts are embedded once
+    missing = {}
+    for digest, text in zip(hashes, texts):
+        if digest not in cached:
+            missing.setdefault(digest, text)
+    missing_hashes = list(missing)
+    batches = [missing_hashes[i:i + batch_size] for i in range(0, len(missing_hashes), batch_size)]
+
+    def embed_batch(batch):
+        return batch, embed_model.get_text_embedding_batch([missing[digest] for digest in batch])
+
+    computed = {}
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, num_threads)) as pool:
+        for batch, vectors in pool.map(embed_batch, batches):
+            computed.update(zip(batch, vectors))
+            if cache:
+                cache.put_many(model_name, zip(batch, vectors))
+            done += len(batch)
+            if progress:
+                progress("embed", done, len(missing_hashes))
+
+    vectors = [cached[digest] if digest in cached else computed[digest] for digest in hashes]
+    cache_hits = sum(1 for digest in hashes if digest in cached)
+    stats = {
+        "texts": len(texts),
+        "embedded": len(computed),
+        "cache_hits": cache_hits,
+        "cache_hit_rate": cache_hits / len(texts) if texts else 0.0,
+        "seconds": round(time.perf_counter() - start_time, 3),
+    }
+    if texts:
+        logger.info(
+            f"Embedded {stats['embedded']} of {stats['texts']} texts "
+            f"({stats['cache_hit_rate']:.0%} cache hits) in {stats['seconds']}s"
+        )
+    return vectors, stats
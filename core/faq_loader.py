@@ -1,6 +1,9 @@
 import os
 import logging
-from core.file_parser import load_faq_pairs
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from core.file_parser import iter_file_faq_pairs
+from core.chunker import chunk_faq_pairs
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -8,6 +11,12 @@ logger = logging.getLogger(__name__)
 
 SUPPORTED_EXTENSIONS = {'.docx', '.pdf', '.txt', '.csv', '.json'}
 
+# Cap on parser processes. Each one is a fresh interpreter, so the default stays low for small instances
+# (e.g. App Engine F1); set PARSE_MAX_WORKERS=1 to always parse in-process
+PARSE_MAX_WORKERS = int(os.getenv("PARSE_MAX_WORKERS", 2))
+# Fewer changed files than this are parsed in-process, where starting the pool would cost more than it saves
+PARSE_POOL_MIN_FILES = int(os.getenv("PARSE_POOL_MIN_FILES", 4))
+
 def get_all_files(data_dir):
     """
     Recursively collects all supported files in the given directory.
@@ -19,7 +28,46 @@ def get_all_files(data_dir):
                 file_paths.append(os.path.join(root, file))
     return file_paths
 
-def load_all_faqs(data_dir='sample_data'):
+def parse_file(file_path):
+    """
+    Parses one file and splits its entries into chunks that fit the embedding model,
+    logging instead of raising so one bad file doesn't stop the others.
+    Returns (file_path, faq_pairs, error): an empty list and the error message if parsing failed, else None.
+    """
+    try:
+        logger.info(f"Processing file: {file_path}")
+        # Pairs stream from the parser through the chunker, so only the chunks are held in memory
+        faq_pairs = list(chunk_faq_pairs(iter_file_faq_pairs(file_path)))
+        logger.info(f"Extracted {len(faq_pairs)} FAQ entries from {file_path}")
+        return file_path, faq_pairs, None
+    except Exception as e:
+        logger.error(f"⚠️ Error parsing {file_path}: {e}")
+        return file_path, [], str(e)
+
+def iter_parsed_files(files, max_workers=None):
+    """
+    Parses files and yields (file_path, faq_pairs, error) as each one finishes.
+    With at least PARSE_POOL_MIN_FILES files and more than one worker, files are fanned out over a
+    process pool, since PDF and DOCX parsing is CPU-bound; results then arrive in completion order.
+    """
+    max_workers = min(max_workers or PARSE_MAX_WORKERS, len(files))
+    if max_workers <= 1 or len(files) < PARSE_POOL_MIN_FILES:
+        for file_path in files:
+            yield parse_file(file_path)
+        return
+
+    # spawn rather than fork: the server process has background threads and loaded model weights
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(parse_file, file_path): file_path for file_path in files}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. out of memory on a huge file)
+                logger.error(f"⚠️ Error parsing {futures[future]}: {e}")
+                yield futures[future], [], str(e)
+
+def load_all_faqs(data_dir='sample_data', max_workers=None):
     """
     Load and combine all Q&A pairs from supported files in the given directory.
     """
@@ -28,14 +76,8 @@ def load_all_faqs(data_dir='sample_data'):
     
     logger.info(f"Found {len(files)} files to process in {data_dir}")
     
-    for file_path in files:
-        try:
-            logger.info(f"Processing file: {file_path}")
-            faq_pairs = load_faq_pairs(file_path)
-            logger.info(f"Extracted {len(faq_pairs)} FAQ entries from {file_path}")
-            all_faqs.extend(faq_pairs)
-        except Exception as e:
-            logger.error(f"⚠️ Error parsing {file_path}: {e}")
+    for _, faq_pairs, _ in iter_parsed_files(files, max_workers):
+        all_faqs.extend(faq_pairs)
     
     logger.info(f"Total FAQ entries loaded: {len(all_faqs)}")
     return all_faqs
@@ -2,9 +2,10 @@ import os
 import re
 import json
 import csv
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter
 import fitz  # PyMuPDF for PDFs
-from docx import Document as DocxDocument
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 SUPPORTED_EXTENSIONS = {".docx", ".pdf", ".txt", ".csv", ".json"}
 
@@ -21,116 +22,226 @@ def is_question(line: str) -> bool:
     line = line.strip()
     return line.endswith('?') or bool(re.match(r'(?i)^(what|how|when|why|is|can|does|do|are|who|where)\b.*\?$', line))
 
-def extract_faq_pairs(lines, file_path=""):
+# Markdown-style headings, e.g. "## **Who We Are**" pasted into a document as plain text
+MARKDOWN_HEADING = re.compile(r'^#{1,6}\s+(.+)$')
+# Sections without questions are yielded in pieces of about this many characters, so a long document
+# without headings isn't held in memory; the chunking stage splits the pieces further
+MAX_SECTION_CHARS = 20000
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def iter_faq_pairs(blocks, file_path=""):
     """
-    Extracts content from plain text lines, handling both Q&A format and general content.
+    Extracts content from text blocks as it streams in, handling both Q&A format and general content.
+    Blocks are (text, is_heading) tuples in document order, e.g. DOCX paragraphs or PDF text blocks;
+    headings set the 'section' of the entries that follow them. Each entry is yielded as soon as it is complete.
+
+    Sections containing questions yield their Q&A pairs. Sections without any yield their text as content,
+    titled by the heading.
     """
-    faq_pairs = []
-    question, answer = "", ""
-    
-    # First try to extract Q&A pairs
-    for line in lines:
-        line = line.strip()
-        if not line:
+    filename = os.path.basename(file_path) if file_path else "this document"
+    section = ""
+    question, answer, question_section = "", [], ""
+    content, content_chars = [], 0  # paragraphs of the current section while it has no questions
+    section_has_questions = False
+
+    def pair():
+        if question and answer:
+            return {"question": question, "answer": " ".join(answer), "section": question_section}
+
+    def section_content():
+        text = "\n\n".join(content)
+        if len(text) > 20:  # Only add content with meaningful text
+            return {"question": section or f"Information about {filename}", "answer": text, "section": section}
+
+    for text, is_heading in blocks:
+        text = text.strip()
+        if not text:
+            continue
+        markdown_heading = MARKDOWN_HEADING.match(text)
+        if markdown_heading and "\n" not in text:
+            text, is_heading = markdown_heading.group(1).replace("**", "").strip(), True
+        if is_heading and not is_question(text):
+            entry = pair() if section_has_questions else section_content()
+            if entry:
+                yield entry
+            question, answer = "", []
+            content, content_chars = [], 0
+            section_has_questions = False
+            section = " ".join(text.split())
+            continue
+
+        lines = [line.strip() for line in text.split("\n") if line.strip()]
+        for line in lines:
+            if is_question(line):
+                entry = pair()
+                if entry:
+                    yield entry
+                question, answer, question_section = line, [], section
+                section_has_questions = True
+                content, content_chars = [], 0
+            elif question:
+                answer.append(line)
+
+        if lines and not section_has_questions:
+            paragraph = " ".join(lines)
+            content.append(paragraph)
+            content_chars += len(paragraph)
+            if content_chars >= MAX_SECTION_CHARS:
+                entry = section_content()
+                if entry:
+                    yield entry
+                content, content_chars = [], 0
+
+    entry = pair() if section_has_questions else section_content()
+    if entry:
+        yield entry
+
+def extract_faq_pairs(blocks, file_path=""):
+    """
+    List of the entries `iter_faq_pairs` yields.
+    """
+    return list(iter_faq_pairs(blocks, file_path))
+
+def _docx_heading_styles(archive):
+    """
+    Ids of the paragraph styles named "Title" or "Heading N" in a DOCX archive.
+    """
+    styles = {"Title"} | {f"Heading{level}" for level in range(1, 10)}
+    try:
+        with archive.open("word/styles.xml") as f:
+            for style in ET.parse(f).getroot().iter(f"{W}style"):
+                name = style.find(f"{W}name")
+                name = name.get(f"{W}val", "") if name is not None else ""
+                if name.lower() == "title" or name.lower().startswith("heading"):
+                    styles.add(style.get(f"{W}styleId"))
+    except KeyError:
+        pass  # No styles part; the built-in ids above still apply
+    return styles
+
+def iter_docx_blocks(file_path):
+    """
+    Yields (paragraph text, is_heading) from a DOCX file one paragraph at a time.
+    The document XML is parsed incrementally and each paragraph is discarded once read, so memory stays
+    flat however long the document is (python-docx would load the whole document tree).
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        heading_styles = _docx_heading_styles(archive)
+        with archive.open("word/document.xml") as f:
+            depth, body = 0, None
+            for event, element in ET.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if element.tag == f"{W}body":
+                        body = element
+                    continue
+                depth -= 1
+                if element.tag == f"{W}p":
+                    parts = []
+                    for node in element.iter():
+                        if node.tag == f"{W}t":
+                            parts.append(node.text or "")
+                        elif node.tag == f"{W}tab":
+                            parts.append("\t")
+                        elif node.tag in (f"{W}br", f"{W}cr"):
+                            parts.append("\n")
+                    style = element.find(f"{W}pPr/{W}pStyle")
+                    is_heading = style is not None and style.get(f"{W}val") in heading_styles
+                    element.clear()  # nested paragraphs (text boxes) are not read twice
+                    text = "".join(parts)
+                    if text.strip():
+                        yield text, is_heading
+                if depth == 2 and body is not None:
+                    body.clear()  # finished a top-level paragraph or table
+
+def pdf_page_blocks(page):
+    """
+    Text blocks of a PDF page as (text, is_heading). A short block is taken as a heading when its
+    font is noticeably larger than the page's body text, or entirely bold.
+    """
+    blocks = []
+    chars_by_size = Counter()
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type") != 0:
             continue
-        if is_question(line):
-            if question and answer:
-                faq_pairs.append({"question": question, "answer": answer.strip()})
-            question = line
-            answer = ""
-        elif question:
-            answer += line + " "
-    
-    if question and answer:
-        faq_pairs.append({"question": question, "answer": answer.strip()})
-    
-    # If no Q&A pairs found, create content chunks from the document
-    if not faq_pairs:
-        content = " ".join([line.strip() for line in lines if line.strip()])
-        if content:
-            # Split content into manageable chunks
-            words = content.split()
-            chunk_size = 100  # words per chunk
-            for i in range(0, len(words), chunk_size):
-                chunk = " ".join(words[i:i + chunk_size])
-                if len(chunk.strip()) > 20:  # Only add chunks with meaningful content
-                    filename = os.path.basename(file_path) if file_path else "this document"
-                    faq_pairs.append({
-                        "question": f"Information about {filename}",
-                        "answer": chunk.strip()
-                    })
-    
-    return faq_pairs
-
-def load_docx(file_path):
-    doc = DocxDocument(file_path)
-    lines = [para.text for para in doc.paragraphs if para.text.strip()]
-    return extract_faq_pairs(lines, file_path)
-
-def load_pdf(file_path):
-    doc = fitz.open(file_path)
-    lines = []
-    for page in doc:
-        lines.extend(page.get_text().split('\n'))
-    return extract_faq_pairs(lines, file_path)
-
-def load_txt(file_path):
+        spans = [span for line in block["lines"] for span in line["spans"] if span["text"].strip()]
+        if not spans:
+            continue
+        text = "\n".join("".join(span["text"] for span in line["spans"]) for line in block["lines"])
+        size = max(span["size"] for span in spans)
+        bold = all(span["flags"] & 16 for span in spans)
+        blocks.append((text, size, bold, len(block["lines"])))
+        for span in spans:
+            chars_by_size[round(span["size"], 1)] += len(span["text"])
+    if not blocks:
+        return []
+
+    # Body text is the font size covering the most characters
+    body_size = chars_by_size.most_common(1)[0][0]
+    return [
+        (text, line_count <= 2 and len(text) <= 120 and (size >= body_size * 1.15 or bold))
+        for text, size, bold, line_count in blocks
+    ]
+
+def iter_pdf_blocks(file_path):
+    """
+    Yields (text, is_heading) from a PDF one page at a time; only the current page is loaded.
+    """
+    with fitz.open(file_path) as doc:
+        for page_number in range(doc.page_count):
+            yield from pdf_page_blocks(doc.load_page(page_number))
+
+def iter_text_blocks(lines):
+    """
+    Groups plain text lines into blank-line separated blocks.
+    """
+    current = []
+    for line in lines:
+        if line.strip():
+            current.append(line.strip())
+        elif current:
+            yield "\n".join(current), False
+            current = []
+    if current:
+        yield "\n".join(current), False
+
+def iter_txt(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    return extract_faq_pairs(lines, file_path)
+        yield from iter_faq_pairs(iter_text_blocks(f), file_path)
 
-def load_csv(file_path):
-    faq_pairs = []
+def iter_csv(file_path):
     with open(file_path, newline='', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
             if 'question' in row and 'answer' in row:
-                faq_pairs.append({
+                yield {
                     "question": row['question'].strip(),
                     "answer": row['answer'].strip()
-                })
-    return faq_pairs
+                }
 
-def load_json(file_path):
+def iter_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
-    return data if isinstance(data, list) else []
+    yield from (data if isinstance(data, list) else [])
 
-def load_faq_pairs(file_path):
+def iter_file_faq_pairs(file_path):
+    """
+    Yields the Q&A pairs of a file as they are parsed, page by page or paragraph by paragraph.
+    """
     ext = os.path.splitext(file_path)[1].lower()
 
     if ext == ".docx":
-        return load_docx(file_path)
+        return iter_faq_pairs(iter_docx_blocks(file_path), file_path)
     elif ext == ".pdf":
-        return load_pdf(file_path)
+        return iter_faq_pairs(iter_pdf_blocks(file_path), file_path)
     elif ext == ".txt":
-        return load_txt(file_path)
+        return iter_txt(file_path)
     elif ext == ".csv":
-        return load_csv(file_path)
+        return iter_csv(file_path)
     elif ext == ".json":
-        return load_json(file_path)
+        return iter_json(file_path)
     else:
         raise ValueError(f"Unsupported file format: {ext}")
 
-def chunk_faqs(faq_list, file_name="unknown_file"):
-    """
-    Splits long answers into smaller semantic chunks with metadata.
-    """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=50,
-        separators=["\n\n", "\n", ".", " "]
-    )
-
-    chunks = []
-    for i, qa in enumerate(faq_list):
-        question = qa.get("question", "")
-        answer = qa.get("answer", "")
-        for chunk in splitter.split_text(answer):
-            chunks.append({
-                "question": question,
-                "chunk": chunk,
-                "source": file_name,
-                "doc_id": f"{file_name}__{i}"
-            })
-    return chunks
+def load_faq_pairs(file_path):
+    return list(iter_file_faq_pairs(file_path))
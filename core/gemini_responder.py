@@ -1,21 +1,38 @@
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
 
-load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+from core.llm_client import get_llm_client, estimate_tokens
+from core.metrics import PROMPT_TOKENS
+from core.sessions import fit_history, truncate_tokens, HISTORY_TOKEN_BUDGET
 
-MODEL = "models/gemini-2.5-flash"
-gemini = genai.GenerativeModel(model_name=MODEL)
+POLISH_ERROR_PREFIX = "Sorry, I couldn't improve the answer"
 
-def polish_response_with_context(user_query: str, rag_answer: str, chat_history: list[str] = None) -> str:
+
+class ErrorText(str):
     """
-    Enhance a RAG answer using Gemini 2.5 Flash, incorporating conversational context.
+    Error message returned or streamed in place of (the rest of) an answer. It reads like any other text,
+    but callers can tell it apart to keep failed answers out of caches and conversation history.
     """
 
+
+# Token budgets for the parts of a prompt (conversation context: HISTORY_TOKEN_BUDGET); the instructions add ~150
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", 1200))
+PROMPT_QUESTION_TOKENS = int(os.getenv("PROMPT_QUESTION_TOKENS", 200))
+
+def build_prompt(user_query: str, rag_answer: str, chat_history: list[str] = None, summary: str = None) -> str:
+    """
+    Builds the Gemini prompt from the user question, the raw RAG answer, the recent chat history and
+    a summary of the conversation before it. Each part is trimmed to its token budget, and the prompt
+    size is recorded in the faq_prompt_tokens histogram.
+    """
+    turns = chat_history if isinstance(chat_history, list) and all(isinstance(turn, dict) for turn in chat_history) else []
+    summary, turns = fit_history(summary, turns, HISTORY_TOKEN_BUDGET)
     context = "\n".join(
-        [f"User: {turn['user']}\nBot: {turn['bot']}" for turn in chat_history]
-    ) if chat_history and isinstance(chat_history, list) and all(isinstance(turn, dict) for turn in chat_history) else "No prior conversation history provided."
+        [f"User: {turn['user']}\nBot: {turn['bot']}" for turn in turns]
+    ) if turns else "No prior conversation history provided."
+    if summary:
+        context = f"Earlier in the conversation: {summary}\n{context}"
+    user_query = truncate_tokens(user_query, PROMPT_QUESTION_TOKENS)
+    rag_answer = truncate_tokens(rag_answer, PROMPT_CONTEXT_TOKENS)
 
     prompt = f"""
 You are a smart and friendly assistant for BrightHorizon Company, a platform created by the user to support career growth, learning, and collaboration.
@@ -39,9 +56,30 @@ Your job is to:
 
 --- YOUR IMPROVED RESPONSE ---
 """
+    for part, text in (("history", context), ("context", rag_answer), ("question", user_query), ("total", prompt)):
+        PROMPT_TOKENS.observe(estimate_tokens(text), part)
+    return prompt
+
+def polish_response_with_context(user_query: str, rag_answer: str, chat_history: list[str] = None, summary: str = None) -> str:
+    """
+    Enhance a RAG answer using Gemini 2.5 Flash, incorporating conversational context.
+    """
+    prompt = build_prompt(user_query, rag_answer, chat_history, summary)
+
+    try:
+        return get_llm_client().generate(prompt).strip()
+    except Exception as e:
+        return ErrorText(f"{POLISH_ERROR_PREFIX} due to an internal issue: {e}")
+
+def stream_response_with_context(user_query: str, rag_answer: str, chat_history: list[str] = None, summary: str = None):
+    """
+    Same as polish_response_with_context, but yields the answer text piece by piece as Gemini generates it.
+    If Gemini fails, possibly after part of the answer was streamed, the last piece is an ErrorText.
+    """
+    prompt = build_prompt(user_query, rag_answer, chat_history, summary)
 
     try:
-        response = gemini.generate_content(prompt)
-        return response.text.strip()
+        for chunk in get_llm_client().stream(prompt):
+            yield chunk
     except Exception as e:
-        return f"Sorry, I couldn't improve the answer due to an internal issue: {e}"
\ No newline at end of file
+        yield ErrorText(f"{POLISH_ERROR_PREFIX} due to an internal issue: {e}")
\ No newline at end of file
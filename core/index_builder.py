@@ -1,41 +1,69 @@
+import hashlib
+
 from llama_index.core import VectorStoreIndex
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.core.node_parser import SimpleNodeParser
-from llama_index.core.schema import TextNode
-from llama_index.core.settings import Settings
+from llama_index.core.schema import TextNode, MetadataMode
 
+from core.embeddings import get_embed_model
 
-def build_index(chunks):
+
+def node_hash(source, text):
     """
-    Builds a vector index from parsed FAQ chunks.
-    Each chunk should contain: 'question', 'answer', 'source', and 'doc_id'.
-    Falls back to defaults if optional metadata is missing.
+    Content hash of a node, used as its id so unchanged Q&A text keeps the same node across reloads.
+    """
+    return hashlib.sha256(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+
+def build_nodes(chunks, source=None):
+    """
+    Converts parsed FAQ chunks into TextNodes.
+    Each chunk should contain: 'question', 'answer', 'source', and 'doc_id', and may carry the 'section' it came from.
+    When `source` is given, node ids are content hashes so they stay stable across rebuilds.
     """
     nodes = []
 
     for i, chunk in enumerate(chunks):
         question = chunk.get("question", f"Untitled Question {i}")
         answer = chunk.get("answer", "No answer provided.")
-        source = chunk.get("source", "unknown")
-        doc_id = chunk.get("doc_id", f"doc_{i}")
+        node_source = chunk.get("source", source or "unknown")
+        doc_id = chunk.get("doc_id", f"{source}__{i}" if source else f"doc_{i}")
+        section = chunk.get("section", "")
 
         text = f"{question}\n{answer}"
 
+        metadata = {
+            "question": question,
+            "source": node_source,
+            "doc_id": doc_id
+        }
+        # The section title is embedded with the text, so chunks of a document match on their heading too
+        if section and section != question:
+            metadata["section"] = section
+
         node = TextNode(
             text=text,
-            metadata={
-                "question": question,
-                "source": source,
-                "doc_id": doc_id
-            }
+            metadata=metadata,
+            # doc_id is positional, keep it out of the embedded text so inserts don't shift hashes
+            excluded_embed_metadata_keys=["doc_id"],
         )
+        if source:
+            node.node_id = node_hash(node_source, node.get_content(metadata_mode=MetadataMode.EMBED))
         nodes.append(node)
 
+    return nodes
+
+
+def build_index(chunks):
+    """
+    Builds a vector index from parsed FAQ chunks.
+    Each chunk should contain: 'question', 'answer', 'source', and 'doc_id'.
+    Falls back to defaults if optional metadata is missing.
+    """
+    nodes = build_nodes(chunks)
+
     # Set embedding model
-    embed_model = HuggingFaceEmbedding(model_name="BAAI/bge-small-en-v1.5")
-    Settings.embed_model = embed_model
-    Settings.llm = None  # Disable LLM-based reasoning, just use embedding
+    get_embed_model()
 
     # Build vector index and return query engine
     index = VectorStoreIndex(nodes)
-    return index.as_query_engine()
\ No newline at end of file
+    return index.as_query_engine()
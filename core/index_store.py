@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import shutil
+import logging
+
+import numpy as np
+from llama_index.core.schema import TextNode
+
+from core.vector_index import VectorIndex
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bumped when the saved layout changes, or parsing or chunking changes the nodes built from unchanged files, so old indexes are rebuilt
+FORMAT_VERSION = 4
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+NODES_FILE = "nodes.jsonl"
+QUESTION_VECTORS_FILE = "question_vectors.npy"
+# Names the generation directory holding the current index; replacing it is what commits a save
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+
+
+def _write_durable(path, write):
+    with open(path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.tmp"
+    _write_durable(tmp_path, write)
+    os.replace(tmp_path, path)
+
+
+def _current_generation(index_dir):
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _remove_old_generations(index_dir, keep):
+    for name in os.listdir(index_dir):
+        if name.startswith(GENERATION_PREFIX) and name not in keep:
+            shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+    # Files of the single-directory layout used before generations
+    for name in (MANIFEST_FILE, VECTORS_FILE, NODES_FILE, QUESTION_VECTORS_FILE):
+        try:
+            os.remove(os.path.join(index_dir, name))
+        except OSError:
+            pass
+
+
+def save_knowledge_base(kb, index_dir, model_name):
+    """
+    Persists a knowledge base to a new generation directory in `index_dir`:
+    - vectors.npy: the search matrix of its VectorIndex (unit-length node embeddings, one row per node)
+    - nodes.jsonl: node id, text and metadata, in the same row order
+    - question_vectors.npy: the question-only embeddings of the fast path, one row per id in `question_ids`
+    - manifest.json: embedding model, `question_ids` and the hash, size and node ids of every source file
+    Once all four are on disk, the CURRENT file is atomically replaced to point at the new generation,
+    so a crash mid-save leaves the previous generation in use, never a mix of old and new files.
+    The previous generation is kept for processes still loading it; older ones are removed.
+    """
+    previous = _current_generation(index_dir)
+    generation = f"{GENERATION_PREFIX}{time.time_ns()}"
+    generation_dir = os.path.join(index_dir, generation)
+    os.makedirs(generation_dir)
+    node_ids, vectors = kb.index.node_ids, kb.index.matrix
+    nodes = [kb.nodes[node_id] for node_id in node_ids]
+    question_ids = list(kb.question_vectors)
+    question_vectors = np.array([kb.question_vectors[node_id] for node_id in question_ids], dtype=np.float32)
+
+    def write_nodes(f):
+        for node in nodes:
+            record = {"id": node.node_id, "text": node.text, "metadata": node.metadata}
+            f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "model": model_name,
+        "node_count": len(nodes),
+        "dim": int(vectors.shape[1]) if len(nodes) else 0,
+        "question_ids": question_ids,
+        "files": {
+            os.path.relpath(file_path, kb.data_dir): entry for file_path, entry in kb.files.items()
+        },
+    }
+
+    _write_durable(os.path.join(generation_dir, VECTORS_FILE), lambda f: np.save(f, vectors))
+    _write_durable(os.path.join(generation_dir, NODES_FILE), write_nodes)
+    _write_durable(os.path.join(generation_dir, QUESTION_VECTORS_FILE), lambda f: np.save(f, question_vectors))
+    _write_durable(
+        os.path.join(generation_dir, MANIFEST_FILE),
+        lambda f: f.write(json.dumps(manifest, indent=1).encode("utf-8")),
+    )
+    _write_atomic(os.path.join(index_dir, CURRENT_FILE), lambda f: f.write(generation.encode("utf-8")))
+    _remove_old_generations(index_dir, keep={generation, previous})
+    logger.info(f"Saved {len(nodes)} nodes to {generation_dir}")
+
+
+def load_knowledge_base(kb, index_dir, model_name):
+    """
+    Restores nodes, the vector index, the question vectors and the file manifest saved by `save_knowledge_base` into `kb`.
+    The vectors are served straight from the memory-mapped files, so loading doesn't read them all.
+    Returns False (leaving `kb` untouched) when nothing usable is on disk. Files that changed since
+    the save are picked up by the next `kb.refresh()`, which only re-indexes those files.
+    """
+    generation = _current_generation(index_dir)
+    if generation is None:
+        return False
+    index_dir = os.path.join(index_dir, generation)
+    manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+
+    start = time.perf_counter()
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != FORMAT_VERSION or manifest.get("model") != model_name:
+            logger.info(f"Persisted index in {index_dir} was built with a different format or model, ignoring it.")
+            return False
+
+        node_count = manifest["node_count"]
+        vectors = np.load(os.path.join(index_dir, VECTORS_FILE), mmap_mode="r")
+        question_ids = manifest["question_ids"]
+        question_vectors = np.load(os.path.join(index_dir, QUESTION_VECTORS_FILE), mmap_mode="r")
+        with open(os.path.join(index_dir, NODES_FILE), encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        if (
+            len(records) != node_count
+            or (node_count and vectors.shape != (node_count, manifest["dim"]))
+            or (question_ids and question_vectors.shape[0] != len(question_ids))
+        ):
+            logger.warning(f"Persisted index in {index_dir} is inconsistent, ignoring it.")
+            return False
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not load persisted index from {index_dir}: {e}")
+        return False
+
+    nodes = {}
+    for record in records:
+        node = TextNode(
+            id_=record["id"],
+            text=record["text"],
+            metadata=record["metadata"],
+            excluded_embed_metadata_keys=["doc_id"],
+        )
+        nodes[node.node_id] = node
+
+    kb.nodes = nodes
+    kb.index = VectorIndex.from_matrix(
+        [record["id"] for record in records], vectors, [record["metadata"] for record in records]
+    )
+    # Rows of the memory-mapped matrix; the next refresh rebuilds the question index from them without embedding
+    kb.question_vectors = {node_id: question_vectors[row] for row, node_id in enumerate(question_ids)}
+    kb.files = {
+        os.path.join(kb.data_dir, rel_path): entry for rel_path, entry in manifest["files"].items()
+    }
+    logger.info(f"Loaded {node_count} nodes from {index_dir} in {time.perf_counter() - start:.3f}s")
+    return True
+
+
+if __name__ == "__main__":
+    # Prebuild the persisted index, e.g. before deploying so new instances start without embedding
+    from core.knowledge_base import KnowledgeBase
+
+    kb = KnowledgeBase(os.getenv("DATA_DIR", "data"), index_dir=os.getenv("INDEX_DIR", "index_store"))
+    print(kb.refresh())
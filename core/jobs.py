@@ -0,0 +1,41 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+
+class JobRegistry:
+    """
+    In-memory registry of background jobs (e.g. ingesting an uploaded file), so clients can poll their progress.
+
+    A job is a dict with 'id', 'kind', 'state' ("queued", "running", "completed" or "failed"),
+    timestamps, and whatever details the job records. Only the most recent `max_jobs` are kept. Thread-safe.
+    """
+
+    def __init__(self, max_jobs=200):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, kind, **details):
+        now = time.time()
+        job = {"id": uuid.uuid4().hex, "kind": kind, "state": "queued", "created_at": now, "updated_at": now, **details}
+        with self._lock:
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return dict(job)
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, updated_at=time.time())
+
+    def get(self, job_id):
+        """
+        Returns a copy of the job, or None if it is unknown or was evicted.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
@@ -0,0 +1,235 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+
+from llama_index.core.schema import MetadataMode
+
+from core.faq_loader import get_all_files, iter_parsed_files
+from core.index_builder import build_nodes
+from core.index_store import save_knowledge_base, load_knowledge_base
+from core.lexical_index import LexicalIndex, HybridRetriever
+from core.question_index import QuestionIndex
+from core.vector_index import VectorIndex, VectorRetriever
+from core.metrics import timed, record_stage
+from core.embeddings import EmbeddingCache, embed_texts, get_embed_model, EMBEDDING_MODEL_ID
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """
+    Returns the SHA-256 of a file's content, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class KnowledgeBase:
+    """
+    Vector index over a data directory that is kept in sync incrementally.
+
+    A content hash is tracked per file and per node, so a refresh only parses the
+    files that changed and only embeds the nodes whose text is new.
+    `retriever` serves queries from the current index.
+    """
+
+    def __init__(self, data_dir="data", index_dir=None, top_k=3, score_threshold=0.0, parse_workers=None):
+        self.data_dir = data_dir
+        self.index_dir = index_dir  # where the index is persisted, None keeps it in memory only
+        self.files = {}  # file path -> {"hash", "size", "mtime", "node_ids", "faq_count", "error"}
+        self.nodes = {}  # node id -> TextNode; their embeddings live in `index`
+        self.top_k = top_k
+        self.score_threshold = score_threshold  # minimum vector similarity for a hit
+        self.parse_workers = parse_workers  # None uses PARSE_MAX_WORKERS
+        # Embeddings are cached by text across rebuilds, next to the persisted index
+        self.embedding_cache = None
+        if index_dir:
+            try:
+                self.embedding_cache = EmbeddingCache(os.path.join(index_dir, "embeddings.sqlite"))
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Embedding cache disabled: {e}")
+        self.index = None
+        self.lexical_index = LexicalIndex()
+        self.question_index = QuestionIndex([], [])
+        self.question_vectors = {}  # node id -> embedding of the question alone
+        self.retriever = None
+        self.generation = 0  # bumped every time a new index is swapped in
+
+    @property
+    def faq_count(self):
+        return sum(entry["faq_count"] for entry in self.files.values())
+
+    def embed_query(self, query):
+        """
+        Embeds a query with the same model as the indexed nodes.
+        """
+        return get_embed_model().get_query_embedding(query)
+
+    def _scan(self):
+        """
+        Returns {file path: (hash, size, mtime)} for the data directory.
+        Files whose size and mtime match the last refresh reuse their recorded hash instead of being re-read.
+        """
+        current = {}
+        for file_path in get_all_files(self.data_dir):
+            try:
+                stat = os.stat(file_path)
+                entry = self.files.get(file_path, {})
+                if entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+                    digest = entry["hash"]
+                else:
+                    digest = file_hash(file_path)
+                current[file_path] = (digest, stat.st_size, stat.st_mtime)
+            except OSError as e:
+                logger.error(f"⚠️ Could not read {file_path}: {e}")
+        return current
+
+    def refresh(self, full=False, progress=None):
+        """
+        Brings the index up to date with the data directory and returns a summary of the changes.
+        With `full=True` every file is re-parsed and every node re-embedded.
+        On first use the persisted index in `index_dir` is loaded, so only files changed since it was saved are re-indexed.
+
+        The new state is built on the side and swapped in at the end, so `retriever` keeps serving
+        the previous index until the new one is ready. `progress(stage, done, total)` is called as work completes.
+        Refreshes must not run concurrently; `core.reloader.IndexReloader` serializes them.
+        """
+        if not full and self.retriever is None and self.index_dir:
+            load_knowledge_base(self, self.index_dir, EMBEDDING_MODEL_ID)
+
+        current = self._scan()
+        files = {} if full else dict(self.files)
+        nodes = {} if full else dict(self.nodes)
+
+        removed = [path for path in files if path not in current]
+        changed = [path for path, (digest, _, _) in current.items() if files.get(path, {}).get("hash") != digest]
+
+        stale_ids = set()
+        added_nodes = []
+
+        for file_path in removed:
+            stale_ids.update(files.pop(file_path)["node_ids"])
+
+        # Files are parsed in parallel and handled in completion order
+        parse_start = time.perf_counter()
+        for i, (file_path, faq_pairs, error) in enumerate(iter_parsed_files(changed, self.parse_workers)):
+            old_ids = set(files.get(file_path, {}).get("node_ids", []))
+            source = os.path.relpath(file_path, self.data_dir)
+            new_nodes = {node.node_id: node for node in build_nodes(faq_pairs, source=source)}
+
+            stale_ids.update(old_ids - new_nodes.keys())
+            added_nodes.extend(node for node_id, node in new_nodes.items() if node_id not in old_ids)
+            digest, size, mtime = current[file_path]
+            files[file_path] = {
+                "hash": digest,
+                "size": size,
+                "mtime": mtime,
+                "node_ids": list(new_nodes),
+                "faq_count": len(faq_pairs),
+                "error": error,
+            }
+            if progress:
+                progress("parse", i + 1, len(changed))
+        if changed:
+            record_stage("parse", time.perf_counter() - parse_start)
+
+        # Touched but unchanged files still get their new size/mtime recorded
+        for file_path, (digest, size, mtime) in current.items():
+            files[file_path] = dict(files[file_path], size=size, mtime=mtime)
+
+        summary = {
+            "files_changed": len(changed),
+            "files_removed": len(removed),
+            "nodes_added": len(added_nodes),
+            "nodes_removed": len(stale_ids),
+            "faq_count": sum(entry["faq_count"] for entry in files.values()),
+        }
+
+        if not full and self.retriever is not None and not stale_ids and not added_nodes:
+            self.files = files
+            logger.info("Knowledge base already up to date.")
+            return summary
+
+        embed_model = get_embed_model()
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in added_nodes]
+        with timed("embed_nodes"):
+            vectors, embed_stats = embed_texts(
+                texts, embed_model, EMBEDDING_MODEL_ID, cache=self.embedding_cache, progress=progress
+            )
+        for node, embedding in zip(added_nodes, vectors):
+            node.embedding = embedding
+        summary["nodes_embedded"] = embed_stats["embedded"]
+        summary["embedding_cache_hit_rate"] = embed_stats["cache_hit_rate"]
+
+        for node_id in stale_ids:
+            nodes.pop(node_id, None)
+        nodes.update((node.node_id, node) for node in added_nodes)
+
+        # Vectorized search matrix; an incremental refresh copies kept rows and only appends the added nodes
+        if full or self.index is None:
+            index = VectorIndex.from_nodes(nodes.values())
+        else:
+            index = self.index.updated(stale_ids, added_nodes)
+        # The matrix holds the embeddings from here on; per-node lists of floats would take ~8x its memory
+        for node in added_nodes:
+            node.embedding = None
+
+        # The BM25 index is updated incrementally on a copy, so the one being served isn't touched
+        if full or not self.lexical_index:
+            # First build, including the first refresh after loading a persisted index
+            lexical_index = LexicalIndex()
+            for node in nodes.values():
+                lexical_index.add(node.node_id, node.text)
+        else:
+            lexical_index = self.lexical_index.clone()
+            for node_id in stale_ids:
+                lexical_index.remove(node_id)
+            for node in added_nodes:
+                lexical_index.add(node.node_id, node.text)
+
+        # Question-only fast path; question vectors carry over between refreshes and are persisted with the index
+        question_vectors = {} if full else dict(self.question_vectors)
+
+        def embed_questions(node_ids, questions):
+            missing = [i for i, node_id in enumerate(node_ids) if node_id not in question_vectors]
+            vectors, _ = embed_texts(
+                [questions[i] for i in missing], embed_model, EMBEDDING_MODEL_ID, cache=self.embedding_cache
+            )
+            question_vectors.update((node_ids[i], vector) for i, vector in zip(missing, vectors))
+            return [question_vectors[node_id] for node_id in node_ids]
+
+        question_index = QuestionIndex.build(nodes.values(), embed_questions)
+        question_vectors = {node_id: question_vectors[node_id] for node_id, _, _ in question_index.entries}
+
+        retriever = HybridRetriever(
+            VectorRetriever(index, nodes, self.embed_query, similarity_top_k=max(self.top_k * 3, 10)),
+            lexical_index,
+            nodes,
+            top_k=self.top_k,
+            vector_threshold=self.score_threshold,
+        )
+
+        self.files, self.nodes, self.index, self.lexical_index = files, nodes, index, lexical_index
+        self.question_index, self.question_vectors = question_index, question_vectors
+        self.retriever = retriever  # atomic swap, queries pick up the new index from here on
+        self.generation += 1
+
+        if self.index_dir and (stale_ids or added_nodes or changed or removed):
+            try:
+                save_knowledge_base(self, self.index_dir, EMBEDDING_MODEL_ID)
+            except OSError as e:
+                logger.error(f"Could not persist index to {self.index_dir}: {e}")
+
+        logger.info(
+            f"Knowledge base updated to generation {self.generation}: {len(changed)} changed and "
+            f"{len(removed)} removed files, {len(added_nodes)} nodes added ({embed_stats['embedded']} embedded), "
+            f"{len(stale_ids)} nodes removed."
+        )
+        return summary
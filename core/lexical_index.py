@@ -0,0 +1,186 @@
+import os
+import re
+import math
+from collections import Counter
+
+from llama_index.core.schema import NodeWithScore
+
+# Fusion settings: weight of each ranking in reciprocal rank fusion, and the RRF damping constant
+HYBRID_VECTOR_WEIGHT = float(os.getenv("HYBRID_VECTOR_WEIGHT", 1.0))
+HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", 1.0))
+RRF_K = int(os.getenv("RRF_K", 60))
+# Minimum BM25 score for a lexical-only match to count as relevant (exact product terms, policy codes)
+LEXICAL_SCORE_THRESHOLD = float(os.getenv("LEXICAL_SCORE_THRESHOLD", 3.0))
+
+# Policy codes and product names like "HR-102" or "v2.1" stay single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in is it my of on or our the this to "
+    "was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text):
+    """
+    Lowercased word tokens without stopwords; compound tokens also emit their parts ("hr-102" -> "hr", "102").
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        parts = re.split(r"[-_./]", token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part and part not in STOPWORDS)
+    return tokens
+
+
+class LexicalIndex:
+    """
+    In-memory inverted index with BM25 scoring. Nodes can be added and removed one at a time.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> {node id: term frequency}
+        self.doc_terms = {}  # node id -> distinct terms, so removal only touches its own postings
+        self.doc_lengths = {}  # node id -> number of tokens
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def clone(self):
+        """
+        Copy that can be updated without affecting searches on this one.
+        """
+        copy = LexicalIndex(self.k1, self.b)
+        copy.postings = {term: dict(docs) for term, docs in self.postings.items()}
+        copy.doc_terms = dict(self.doc_terms)
+        copy.doc_lengths = dict(self.doc_lengths)
+        copy.total_length = self.total_length
+        return copy
+
+    def add(self, node_id, text):
+        if node_id in self.doc_lengths:
+            self.remove(node_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[node_id] = tf
+        length = sum(counts.values())
+        self.doc_terms[node_id] = tuple(counts)
+        self.doc_lengths[node_id] = length
+        self.total_length += length
+
+    def remove(self, node_id):
+        length = self.doc_lengths.pop(node_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in self.doc_terms.pop(node_id):
+            del self.postings[term][node_id]
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def search(self, query, top_k=10):
+        """
+        Returns [(node id, BM25 score)] for the best matching nodes, best first.
+        """
+        if not self.doc_lengths:
+            return []
+        doc_count = len(self.doc_lengths)
+        avg_length = self.total_length / doc_count or 1.0
+        scores = Counter()
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for node_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[node_id] / avg_length)
+                scores[node_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores.most_common(top_k)
+
+
+def reciprocal_rank_fusion(rankings, weights, k=RRF_K):
+    """
+    Fuses ranked lists of node ids: score(id) = sum(weight / (k + rank)). Returns [(node id, score)], best first.
+    """
+    fused = Counter()
+    for ranking, weight in zip(rankings, weights):
+        for rank, node_id in enumerate(ranking, start=1):
+            fused[node_id] += weight / (k + rank)
+    return fused.most_common()
+
+
+class HybridRetriever:
+    """
+    Combines vector retrieval with BM25 over the same nodes using weighted reciprocal rank fusion.
+
+    Vector hits below `vector_threshold` and lexical hits below `lexical_threshold` are dropped before
+    fusion, so an empty result means nothing relevant was found. Results are NodeWithScore in fused order,
+    with the fused score; the individual scores are added to a copy of each node's metadata.
+    """
+
+    def __init__(self, vector_retriever, lexical_index, nodes, top_k=3, vector_threshold=0.0,
+                 lexical_threshold=LEXICAL_SCORE_THRESHOLD, vector_weight=HYBRID_VECTOR_WEIGHT,
+                 lexical_weight=HYBRID_LEXICAL_WEIGHT):
+        self.vector_retriever = vector_retriever
+        self.lexical_index = lexical_index
+        self.nodes = nodes
+        self.top_k = top_k
+        self.vector_threshold = vector_threshold
+        self.lexical_threshold = lexical_threshold
+        self.vector_weight = vector_weight
+        self.lexical_weight = lexical_weight
+
+    def _matches(self, node_id, filters):
+        metadata = self.nodes[node_id].metadata
+        for key, wanted in filters.items():
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            if metadata.get(key) not in wanted:
+                return False
+        return True
+
+    def retrieve(self, query_bundle, filters=None):
+        """
+        `filters` restricts results by node metadata, e.g. {"source": ["hr.pdf", "it.docx"]}.
+        """
+        vector_hits = {
+            result.node.node_id: result.score
+            for result in self.vector_retriever.retrieve(query_bundle, filters=filters)
+            if result.score is not None and result.score >= self.vector_threshold
+        }
+        lexical_hits = {}
+        if self.lexical_weight > 0:
+            candidates = self.vector_retriever.similarity_top_k
+            # Filtered-out nodes would take candidate slots, so fetch extra before filtering
+            lexical_hits = {
+                node_id: score
+                for node_id, score in self.lexical_index.search(
+                    query_bundle.query_str, top_k=candidates * 5 if filters else candidates
+                )
+                if score >= self.lexical_threshold and node_id in self.nodes
+                and (not filters or self._matches(node_id, filters))
+            }
+            lexical_hits = dict(list(lexical_hits.items())[:candidates])
+
+        fused = reciprocal_rank_fusion(
+            [sorted(vector_hits, key=vector_hits.get, reverse=True), list(lexical_hits)],
+            [self.vector_weight, self.lexical_weight],
+        )
+
+        results = []
+        for node_id, score in fused[:self.top_k]:
+            node = self.nodes.get(node_id)
+            if node is None:
+                continue
+            node = node.model_copy(update={"embedding": None})
+            node.metadata = {
+                **node.metadata,
+                "vector_score": vector_hits.get(node_id),
+                "lexical_score": lexical_hits.get(node_id),
+            }
+            results.append(NodeWithScore(node=node, score=score))
+        return results
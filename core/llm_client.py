@@ -0,0 +1,328 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+# "gemini" (REST API) or "fake" (local canned answers, for offline testing and benchmarks)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+# Overall deadline of one call, retries included
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 0.5))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 8))
+# Send a second, identical request if the first has not answered after this many seconds (0 disables hedging)
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", 0))
+# Keep-alive connections kept open to the API
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 16))
+# Fake backend behavior
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", 0.3))
+FAKE_LLM_FAILURE_RATE = float(os.getenv("FAKE_LLM_FAILURE_RATE", 0))
+
+
+def estimate_tokens(text):
+    """
+    Approximate Gemini token count of `text`: about 4 characters per token for English, without a network call.
+    """
+    return -(-len(text) // 4)
+
+
+class LLMError(Exception):
+    """
+    A failed LLM request. `status` is the HTTP status, or None for timeouts and connection errors.
+    """
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status is None or self.status == 429 or self.status >= 500
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _candidate_text(payload):
+    """
+    Text of the first candidate of a generateContent response (or stream chunk).
+    """
+    candidates = payload.get("candidates") or []
+    if not candidates:
+        reason = (payload.get("promptFeedback") or {}).get("blockReason")
+        if reason:
+            raise LLMError(f"Prompt blocked: {reason}", status=400)
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+class GeminiRestBackend:
+    """
+    Gemini over its REST API on one pooled `requests.Session`, so calls reuse keep-alive connections
+    instead of a new TLS handshake each time. The API key goes in a header, never in the URL.
+    """
+
+    def __init__(self, api_key, model=GEMINI_MODEL, pool_size=LLM_POOL_SIZE, base_url=GEMINI_API_URL):
+        if not api_key:
+            raise ValueError("Google API key not found.")
+        self.model = model if model.startswith("models/") else f"models/{model}"
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json", "x-goog-api-key": api_key})
+
+    def _post(self, method, prompt, timeout, **kwargs):
+        url = f"{self.base_url}/{self.model}:{method}"
+        body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        try:
+            response = self.session.post(url, data=json.dumps(body), timeout=timeout, **kwargs)
+        except requests.Timeout as e:
+            raise LLMError(f"Gemini request timed out: {e}") from e
+        except requests.RequestException as e:
+            raise LLMError(f"Gemini request failed: {e}") from e
+        if response.status_code != 200:
+            message = response.text[:500]
+            response.close()
+            raise LLMError(f"Gemini error {response.status_code}: {message}", response.status_code, _retry_after(response))
+        return response
+
+    def generate(self, prompt, timeout):
+        response = self._post("generateContent", prompt, timeout)
+        try:
+            return _candidate_text(response.json())
+        except ValueError as e:
+            raise LLMError(f"Invalid Gemini response: {e}", status=502) from e
+
+    def stream(self, prompt, timeout):
+        """
+        Yields text as it is generated (server-sent events). `timeout` bounds the wait for each chunk.
+        """
+        with self._post("streamGenerateContent", prompt, timeout, params={"alt": "sse"}, stream=True) as response:
+            try:
+                for line in response.iter_lines():
+                    line = line.decode("utf-8")
+                    if line.startswith("data:"):
+                        text = _candidate_text(json.loads(line[5:]))
+                        if text:
+                            yield text
+            except requests.RequestException as e:
+                raise LLMError(f"Gemini stream interrupted: {e}") from e
+
+
+def echo_prompt_answer(prompt):
+    """
+    Default answer of the fake backend: the raw FAQ answer from a build_prompt() prompt, or a fixed text.
+    """
+    _, marker, rest = prompt.partition("--- RAW FAQ ANSWER ---")
+    if marker:
+        return rest.split("---", 1)[0].strip()
+    return "This is a canned answer from the fake LLM backend."
+
+
+class FakeLLMBackend:
+    """
+    Local stand-in for Gemini with configurable latency and failures, for testing timeouts, retries and
+    hedging offline. Each request takes `latency` seconds plus up to `jitter`, except that a `slow_rate`
+    fraction take `slow_latency` (a latency tail), and a `failure_rate` fraction fail with `failure_status`.
+    Streams yield the answer word by word, the first word after the request latency.
+    """
+
+    def __init__(self, latency=0.3, jitter=0.0, failure_rate=0.0, failure_status=503,
+                 slow_rate=0.0, slow_latency=5.0, answer=echo_prompt_answer, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.answer = answer
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _request(self, timeout):
+        with self._lock:
+            self.calls += 1
+            slow = self._random.random() < self.slow_rate
+            latency = self.slow_latency if slow else self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.failure_rate
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise LLMError(f"Fake LLM request timed out after {timeout:.2f}s")
+        time.sleep(latency)
+        if failed:
+            raise LLMError(f"Fake LLM error {self.failure_status}", self.failure_status)
+
+    def generate(self, prompt, timeout):
+        self._request(timeout)
+        return self.answer(prompt)
+
+    def stream(self, prompt, timeout):
+        self._request(timeout)
+        for word in self.answer(prompt).split(" "):
+            yield word + " "
+
+
+class LLMClient:
+    """
+    Calls a backend (GeminiRestBackend or FakeLLMBackend) under a per-call deadline, retrying 429s,
+    5xx errors and timeouts with full-jitter exponential backoff (or the server's Retry-After).
+
+    With `hedge_after` set, a request that has not answered after that many seconds is sent a second
+    time and the first success wins, which cuts tail latency at the cost of some duplicate requests.
+    The losing request is not cancelled; it finishes in the background. Streams are retried only
+    until the first chunk arrives and are never hedged. Thread-safe.
+    """
+
+    def __init__(self, backend, timeout=GEMINI_TIMEOUT_SECONDS, max_retries=LLM_MAX_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE_SECONDS, backoff_max=LLM_BACKOFF_MAX_SECONDS,
+                 hedge_after=LLM_HEDGE_AFTER_SECONDS, max_workers=LLM_POOL_SIZE):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm") if hedge_after else None
+        self._stats = {"calls": 0, "requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _backoff(self, attempt, error, deadline):
+        """
+        Seconds to wait before retry number `attempt`, or None if it would not fit before the deadline.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return delay if time.monotonic() + delay < deadline else None
+
+    def _with_retries(self, call, deadline):
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMError("LLM call deadline exceeded")
+            try:
+                return call(remaining)
+            except LLMError as e:
+                delay = self._backoff(attempt, e, deadline) if e.retryable and attempt < self.max_retries else None
+                if delay is None:
+                    self._count("failures")
+                    raise
+                logger.warning(f"LLM request failed ({e}), retrying in {delay:.2f}s")
+                self._count("retries")
+                time.sleep(delay)
+
+    def _hedged(self, prompt, timeout):
+        self._count("requests")
+        primary = self._executor.submit(self.backend.generate, prompt, timeout)
+        done, _ = wait([primary], timeout=min(self.hedge_after, timeout))
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        self._count("requests")
+        hedge = self._executor.submit(self.backend.generate, prompt, max(timeout - self.hedge_after, 0.001))
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except LLMError as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    self._count("hedge_wins")
+                return result
+        raise error
+
+    def _single(self, prompt, timeout):
+        self._count("requests")
+        return self.backend.generate(prompt, timeout)
+
+    def generate(self, prompt, timeout=None):
+        """
+        Returns the generated text. Raises LLMError once retries or the deadline (`timeout` seconds,
+        default GEMINI_TIMEOUT_SECONDS) run out.
+        """
+        self._count("calls")
+        deadline = time.monotonic() + (timeout or self.timeout)
+        request = self._hedged if self._executor else self._single
+        return self._with_retries(lambda remaining: request(prompt, remaining), deadline)
+
+    def stream(self, prompt, timeout=None):
+        """
+        Yields the generated text piece by piece. Raises LLMError on failure or once the deadline passes.
+        """
+        self._count("calls")
+        deadline = time.monotonic() + (timeout or self.timeout)
+
+        def first_chunk(remaining):
+            self._count("requests")
+            chunks = iter(self.backend.stream(prompt, remaining))
+            return chunks, next(chunks, None)
+
+        chunks, chunk = self._with_retries(first_chunk, deadline)
+        while chunk is not None:
+            yield chunk
+            if time.monotonic() > deadline:
+                self._count("failures")
+                raise LLMError("LLM stream deadline exceeded")
+            chunk = next(chunks, None)
+
+
+def create_llm_client(backend=LLM_BACKEND):
+    """
+    The LLMClient for the configured backend ("gemini" or "fake").
+    """
+    if backend == "fake":
+        return LLMClient(FakeLLMBackend(latency=FAKE_LLM_LATENCY_SECONDS, failure_rate=FAKE_LLM_FAILURE_RATE))
+    api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+    return LLMClient(GeminiRestBackend(api_key))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """
+    The process-wide LLMClient, created on first use, so every caller shares its connection pool.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_llm_client()
+    return _client
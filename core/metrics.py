@@ -0,0 +1,230 @@
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from a cached answer up to a slow Gemini call or index rebuild
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """
+    Prometheus-style histogram: per label set, counts of observations per bucket, their sum and count.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            series = self._series.setdefault(labelvalues, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        """
+        Current totals as {label values tuple: (sum, count)}.
+        """
+        with self._lock:
+            return {labels: (values[-2], values[-1]) for labels, values in self._series.items()}
+
+    def samples(self):
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        lines = []
+        for labelvalues, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = _format_labels(self.labelnames, labelvalues, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            inf = _format_labels(self.labelnames, labelvalues, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{inf} {values[-1]}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{labels} {values[-1]}")
+        return lines
+
+
+class Counter:
+    """
+    Prometheus-style counter, per label set.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def snapshot(self):
+        """
+        Current values as {label values tuple: value}.
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self):
+        values = self.snapshot()
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+            for labelvalues, value in sorted(values.items())
+        ]
+
+
+class CallbackMetric:
+    """
+    Gauge or counter read at scrape time from state kept elsewhere (cache stats, index size).
+    `read()` returns {label values tuple: value}.
+    """
+
+    def __init__(self, name, help, read, labelnames=(), type="gauge"):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.labelnames = tuple(labelnames)
+        self.type = type
+
+    def samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+            for labelvalues, value in sorted(self.read().items())
+        ]
+
+
+class MetricsRegistry:
+    """
+    Metrics rendered together in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                logger.warning(f"Could not collect metric {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "faq_stage_duration_seconds",
+    "Time spent in each stage of answering a question or rebuilding the index.",
+    labelnames=("stage",),
+))
+REQUEST_SECONDS = registry.register(Histogram(
+    "faq_request_duration_seconds",
+    "Time until the response headers are sent, per endpoint.",
+    labelnames=("method", "endpoint", "status"),
+))
+INDEX_REBUILD_SECONDS = registry.register(Histogram(
+    "faq_index_rebuild_duration_seconds",
+    "Duration of knowledge base rebuilds.",
+    labelnames=("outcome",),
+))
+PROMPT_TOKENS = registry.register(Histogram(
+    "faq_prompt_tokens",
+    "Estimated tokens per Gemini prompt, in total and per part (history, context, question).",
+    labelnames=("part",),
+    buckets=(25, 50, 100, 200, 400, 800, 1200, 1600, 2400, 3200, 4800, 6400),
+))
+ANSWERS = registry.register(Counter(
+    "faq_answers_total",
+    "Answers by where they came from: answer cache, question fast path, not found, or Gemini.",
+    labelnames=("source",),
+))
+
+# Stage timings of the current request, as (stage, seconds); None outside a request
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings():
+    """
+    Starts collecting stage timings for the current request (context); returns the list they are appended to.
+    Threads started through utils.concurrency.run_blocking or Starlette's thread pool inherit it.
+    """
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+def record_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage):
+    """
+    Records the duration of the block in the stage histogram and in the current request's timings.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def server_timing(timings, total=None):
+    """
+    Server-Timing header value for a request's stage timings, summing repeated stages (e.g. one TTS call per sentence).
+    """
+    durations = {}
+    for stage, seconds in list(timings):
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    if total is not None:
+        durations["total"] = total
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in durations.items())
@@ -0,0 +1,85 @@
+import os
+import re
+
+import numpy as np
+
+# Minimum cosine similarity between the query and a stored question for a near-exact match
+QUESTION_MATCH_THRESHOLD = float(os.getenv("QUESTION_MATCH_THRESHOLD", 0.9))
+
+
+def normalize_question(text):
+    """
+    Lowercases and strips punctuation and extra whitespace, so "How do I reset my password?" and
+    "how do i reset my password" compare equal.
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+class QuestionIndex:
+    """
+    Fast path over the stored FAQ questions alone: a hash map of normalized questions for exact
+    matches and a small normalized matrix of question embeddings for near matches.
+
+    Questions shared by several nodes (e.g. the generic titles of document chunks) are ambiguous
+    and left out, so a hit always maps to a single stored answer.
+    """
+
+    def __init__(self, entries, vectors, threshold=QUESTION_MATCH_THRESHOLD):
+        self.entries = entries  # [(node id, question, answer)]
+        self.exact = {normalize_question(question): i for i, (_, question, _) in enumerate(entries)}
+        self.threshold = threshold
+        if entries:
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.matrix = matrix / np.where(norms == 0, 1, norms)
+        else:
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, nodes, embed_questions, threshold=QUESTION_MATCH_THRESHOLD):
+        """
+        Builds the index from TextNodes, whose text is "question\nanswer".
+        `embed_questions(node_ids, questions)` returns the question embeddings; it is only called for unambiguous questions.
+        """
+        by_question = {}
+        for node in nodes:
+            question = node.metadata.get("question", "")
+            if question:
+                by_question.setdefault(normalize_question(question), []).append(node)
+
+        entries = []
+        for candidates in by_question.values():
+            if len(candidates) != 1:
+                continue
+            node = candidates[0]
+            question = node.metadata["question"]
+            answer = node.text[len(question):].strip() if node.text.startswith(question) else node.text
+            entries.append((node.node_id, question, answer))
+
+        vectors = embed_questions([entry[0] for entry in entries], [entry[1] for entry in entries]) if entries else []
+        return cls(entries, vectors, threshold)
+
+    def _result(self, i, score, match):
+        node_id, question, answer = self.entries[i]
+        return {"node_id": node_id, "question": question, "answer": answer, "score": score, "match": match}
+
+    def match_exact(self, query):
+        """
+        Returns the stored question and answer whose normalized text equals the query's, or None.
+        """
+        i = self.exact.get(normalize_question(query))
+        return None if i is None else self._result(i, 1.0, "exact")
+
+    def match_near(self, embedding):
+        """
+        Returns the stored question most similar to the query embedding if it clears the threshold, or None.
+        """
+        if not self.entries:
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        similarities = self.matrix @ (query / (np.linalg.norm(query) or 1))
+        i = int(np.argmax(similarities))
+        return self._result(i, float(similarities[i]), "near") if similarities[i] >= self.threshold else None
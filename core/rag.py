@@ -1,22 +1,86 @@
+import re
 
+from llama_index.core.schema import QueryBundle
 
-from llama_index.core import VectorStoreIndex
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.core.schema import TextNode
-from llama_index.core.settings import Settings
+from core.llm_client import estimate_tokens
+from core.sessions import truncate_tokens
 
-# Load your pre-built index once globally (build elsewhere)
-from core.index_builder import build_index
-from core.faq_loader import load_faqs
+NOT_FOUND_ANSWER = (
+    "I couldn't find anything about that in our FAQs. "
+    "Could you rephrase your question, or ask about something else?"
+)
 
-# Set embedding model
-Settings.embed_model = HuggingFaceEmbedding(model_name="BAAI/bge-small-en-v1.5")
-Settings.llm = None
 
-faq_chunks = load_faqs("data/")
-query_engine = build_index(faq_chunks)
+def retrieve_faq_chunks(retriever, query, embedding=None, top_k=3, score_threshold=0.0, filters=None):
+    """
+    Returns the top_k retrieved chunks scoring at least score_threshold, best first.
+    Calls the retriever directly, so no response synthesizer runs. Each chunk is a dict with
+    'text', 'score' and the node metadata ('question', 'source', 'doc_id').
+    Pass the query `embedding` if it is already computed to avoid embedding the query twice.
+    `filters` restricts the search by node metadata, e.g. {"source": "hr_policies.pdf"}.
+    """
+    bundle = QueryBundle(query, embedding=embedding)
+    results = retriever.retrieve(bundle, filters=filters) if filters else retriever.retrieve(bundle)
+    results = sorted(results, key=lambda result: result.score or 0.0, reverse=True)
 
-def retrieve_faq_chunks(query, top_k=3):
-    """Returns top_k relevant nodes from index"""
-    results = query_engine.retrieve(query)
-    return results[:top_k]
+    chunks = []
+    for result in results[:top_k]:
+        if result.score is None or result.score < score_threshold:
+            break
+        chunks.append({"text": result.node.get_content(), "score": result.score, **result.node.metadata})
+    return chunks
+
+
+WORD = re.compile(r"\w+")
+
+# Passages shorter than this are not worth including once the context budget is nearly spent
+MIN_PASSAGE_TOKENS = 32
+
+
+def _shingles(text, size=3):
+    words = WORD.findall(text.lower())
+    return {tuple(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+
+
+def dedupe_chunks(chunks, threshold=0.8):
+    """
+    Drops near-duplicate chunks, best scoring first: a chunk is dropped when at least `threshold` of
+    the word 3-grams of the shorter of it and an already kept chunk appear in the other one. This
+    catches the same FAQ indexed from two files, and chunks mostly contained in overlapping neighbours.
+    """
+    kept, kept_shingles = [], []
+    for chunk in sorted(chunks, key=lambda chunk: chunk.get("score") or 0.0, reverse=True):
+        shingles = _shingles(chunk["text"])
+        if any(len(shingles & other) >= threshold * min(len(shingles), len(other)) for other in kept_shingles):
+            continue
+        kept.append(chunk)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def format_context(chunks, max_tokens=None, dedup_threshold=None, count_tokens=estimate_tokens):
+    """
+    Joins retrieved chunks into the raw answer passed to Gemini, best scoring first. Near-duplicates
+    are dropped when `dedup_threshold` is set (see dedupe_chunks), and with `max_tokens` passages are
+    added until the budget is spent, the last one cut short if enough room is left for it.
+    """
+    if dedup_threshold is not None:
+        chunks = dedupe_chunks(chunks, dedup_threshold)
+    else:
+        chunks = sorted(chunks, key=lambda chunk: chunk.get("score") or 0.0, reverse=True)
+    if max_tokens is None:
+        return "\n\n".join(chunk["text"] for chunk in chunks)
+
+    passages, used = [], 0
+    for chunk in chunks:
+        room = max_tokens - used - (1 if passages else 0)  # the blank line between passages
+        tokens = count_tokens(chunk["text"])
+        if tokens <= room:
+            passages.append(chunk["text"])
+        elif room >= MIN_PASSAGE_TOKENS:
+            passages.append(truncate_tokens(chunk["text"], room, count_tokens))
+            break
+        else:
+            break
+        used += tokens + (1 if len(passages) > 1 else 0)
+    return "\n\n".join(passages)
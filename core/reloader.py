@@ -0,0 +1,115 @@
+import time
+import logging
+import threading
+
+from core.metrics import INDEX_REBUILD_SECONDS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IndexReloader:
+    """
+    Runs knowledge-base refreshes on a background thread.
+
+    Queries keep using the current index while a rebuild runs; the knowledge base swaps
+    in the new one with a single reference assignment when it is ready. Requests that
+    arrive during a rebuild are merged into one follow-up rebuild.
+    """
+
+    def __init__(self, knowledge_base):
+        self.knowledge_base = knowledge_base
+        self._cond = threading.Condition()
+        self._running = False
+        self._pending_full = None  # None when no rebuild is queued, else whether it must be a full one
+        self._requested = 0  # ticket of the latest request
+        self._completed = 0  # highest ticket covered by a finished rebuild
+        self._callbacks = []  # (ticket, on_done) waiting for the rebuild covering the ticket
+        self.state = "idle"
+        self.progress = {}
+        self.started_at = None
+        self.last_duration = None
+        self.last_summary = None
+        self.last_error = None
+
+    def request(self, full=False, on_done=None):
+        """
+        Queues a rebuild and returns a ticket that can be passed to `wait()`.
+        `on_done(summary, error)` is called on the reloader thread once the rebuild covering the request finishes.
+        """
+        with self._cond:
+            self._requested += 1
+            self._pending_full = bool(self._pending_full) or full
+            if on_done is not None:
+                self._callbacks.append((self._requested, on_done))
+            if not self._running:
+                self._running = True
+                threading.Thread(target=self._run, name="index-reloader", daemon=True).start()
+            return self._requested
+
+    def wait(self, ticket, timeout=None):
+        """
+        Blocks until the rebuild covering `ticket` has finished. Returns False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._completed >= ticket, timeout=timeout)
+
+    def _on_progress(self, stage, done, total):
+        self.progress = {"stage": stage, "done": done, "total": total}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._pending_full is None:
+                    self._running = False
+                    self.state = "idle"
+                    return
+                full, self._pending_full = self._pending_full, None
+                ticket = self._requested
+                self.state = "rebuilding"
+                self.started_at = time.time()
+                self.progress = {}
+
+            try:
+                summary = self.knowledge_base.refresh(full=full, progress=self._on_progress)
+                error = None
+            except Exception as e:
+                logger.error(f"Failed to reload knowledge base: {e}")
+                summary, error = None, str(e)
+
+            with self._cond:
+                self.last_duration = time.time() - self.started_at
+                INDEX_REBUILD_SECONDS.observe(self.last_duration, "failed" if error else "completed")
+                self.last_summary = summary
+                self.last_error = error
+                self._completed = ticket
+                self._cond.notify_all()
+                done = [on_done for callback_ticket, on_done in self._callbacks if callback_ticket <= ticket]
+                self._callbacks = [entry for entry in self._callbacks if entry[0] > ticket]
+
+            for on_done in done:
+                try:
+                    on_done(summary, error)
+                except Exception as e:
+                    logger.error(f"Reload callback failed: {e}")
+
+    def status(self):
+        """
+        Returns the index generation and the state of the current or last rebuild.
+        """
+        with self._cond:
+            status = {
+                "generation": self.knowledge_base.generation,
+                "faq_count": self.knowledge_base.faq_count,
+                "node_count": len(self.knowledge_base.nodes),
+                "state": self.state,
+                "pending": self._pending_full is not None,
+                "last_duration_seconds": self.last_duration,
+                "last_summary": self.last_summary,
+                "last_error": self.last_error,
+            }
+            if self.state == "rebuilding":
+                status["progress"] = self.progress
+                status["elapsed_seconds"] = time.time() - self.started_at
+            return status
@@ -0,0 +1,142 @@
+import os
+import re
+import time
+import secrets
+import threading
+from collections import OrderedDict
+
+from core.llm_client import estimate_tokens
+
+SESSION_MAX = int(os.getenv("SESSION_MAX", 10000))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", 1800))
+# Recent turns kept verbatim; older ones are folded into the session summary
+SESSION_WINDOW_TURNS = int(os.getenv("SESSION_WINDOW_TURNS", 6))
+# Token budgets: the summary of older turns, and all conversation context (summary + turns) in one prompt
+SESSION_SUMMARY_TOKENS = int(os.getenv("SESSION_SUMMARY_TOKENS", 200))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 800))
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def truncate_tokens(text, max_tokens, count_tokens=estimate_tokens):
+    """
+    Cuts `text` to at most `max_tokens`, at a word boundary, marking the cut with "...".
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle]) + " ...") <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low]) + " ..." if low else ""
+
+
+def summarize_turn(turn, max_tokens=40, count_tokens=estimate_tokens):
+    """
+    One summary line for a turn: the question and the first sentence of the answer.
+    """
+    answer = SENTENCE_END.split(turn.get("bot", "").strip(), 1)[0]
+    return truncate_tokens(f"User asked: {turn.get('user', '').strip()} Bot: {answer}", max_tokens, count_tokens)
+
+
+def fit_history(summary, turns, max_tokens=HISTORY_TOKEN_BUDGET, count_tokens=estimate_tokens):
+    """
+    Trims conversation context to `max_tokens`: the most recent turns are kept, oldest dropped first,
+    and the summary gets whatever room is left. Returns (summary, turns).
+    """
+    kept, used = [], 0
+    for turn in reversed(turns):
+        tokens = count_tokens(f"User: {turn.get('user', '')}\nBot: {turn.get('bot', '')}")
+        if used + tokens > max_tokens:
+            break
+        kept.append(turn)
+        used += tokens
+    return truncate_tokens(summary or "", max_tokens - used, count_tokens), kept[::-1]
+
+
+class SessionStore:
+    """
+    Server-side conversation sessions, so clients send a session id instead of their whole chat history.
+
+    Each session keeps its last `window_turns` turns verbatim and a compact extractive summary of the older
+    ones (one line per turn, oldest lines dropped beyond `summary_tokens`). Sessions expire after
+    `ttl_seconds` without use and the least recently used are evicted beyond `max_sessions`. Thread-safe.
+    """
+
+    def __init__(self, max_sessions=SESSION_MAX, ttl_seconds=SESSION_TTL_SECONDS, window_turns=SESSION_WINDOW_TURNS,
+                 summary_tokens=SESSION_SUMMARY_TOKENS, history_tokens=HISTORY_TOKEN_BUDGET, count_tokens=estimate_tokens):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.window_turns = window_turns
+        self.summary_tokens = summary_tokens
+        self.history_tokens = history_tokens
+        self.count_tokens = count_tokens
+        self._sessions = OrderedDict()  # id -> {"summary": [lines], "turns": [...], "expires_at"}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict(self, now):
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session["expires_at"] > now and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
+
+    def _get(self, session_id, now):
+        session = self._sessions.get(session_id)
+        if session is None or session["expires_at"] <= now:
+            self._sessions.pop(session_id, None)
+            return None
+        session["expires_at"] = now + self.ttl_seconds
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def create(self):
+        session_id = secrets.token_urlsafe(16)
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = {"summary": [], "turns": [], "expires_at": now + self.ttl_seconds}
+            self._evict(now)
+        return session_id
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def context(self, session_id):
+        """
+        Returns (summary, recent turns) for the prompt, within the history token budget,
+        or None if the session is unknown or expired.
+        """
+        with self._lock:
+            session = self._get(session_id, time.monotonic())
+            if session is None:
+                return None
+            summary, turns = " ".join(session["summary"]), list(session["turns"])
+        return fit_history(summary, turns, self.history_tokens, self.count_tokens)
+
+    def add_turn(self, session_id, user, bot):
+        """
+        Records a question and its answer. Returns False if the session is unknown or expired.
+        """
+        turn = {"user": user, "bot": bot}
+        with self._lock:
+            session = self._get(session_id, time.monotonic())
+            if session is None:
+                return False
+            session["turns"].append(turn)
+            while len(session["turns"]) > self.window_turns:
+                session["summary"].append(summarize_turn(session["turns"].pop(0), count_tokens=self.count_tokens))
+            while session["summary"] and self.count_tokens(" ".join(session["summary"])) > self.summary_tokens:
+                session["summary"].pop(0)
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._sessions), "max_sessions": self.max_sessions, "ttl_seconds": self.ttl_seconds}
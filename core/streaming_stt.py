@@ -0,0 +1,154 @@
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Interim results at least this stable (Google's 0-1 estimate that they won't change) count as settled text
+STT_STABILITY_THRESHOLD = float(os.getenv("STT_STABILITY_THRESHOLD", 0.8))
+
+
+class GoogleStreamingRecognizer:
+    """
+    Streaming recognition with Google Speech-to-Text: WEBM_OPUS chunks in, results out as they are recognized.
+
+    `recognize(chunks)` blocks, so it is run on its own thread (see StreamingTranscription). It yields,
+    per response, a list of (transcript, is_final, stability) results. Google ends a stream after about
+    five minutes of audio.
+    """
+
+    def __init__(self, client, language_code="en-US", sample_rate_hertz=48000, timeout=None):
+        self.client = client
+        self.language_code = language_code
+        self.sample_rate_hertz = sample_rate_hertz
+        self.timeout = timeout
+
+    def recognize(self, chunks):
+        from google.cloud import speech
+
+        config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+                sample_rate_hertz=self.sample_rate_hertz,
+                language_code=self.language_code,
+                enable_automatic_punctuation=True,
+            ),
+            interim_results=True,
+        )
+        requests = (speech.StreamingRecognizeRequest(audio_content=chunk) for chunk in chunks)
+        for response in self.client.streaming_recognize(config=config, requests=requests, timeout=self.timeout):
+            results = [
+                (result.alternatives[0].transcript, result.is_final, result.stability)
+                for result in response.results if result.alternatives
+            ]
+            if results:
+                yield results
+
+
+class FakeStreamingRecognizer:
+    """
+    Local stand-in for streaming recognition, for tests, benchmarks and development without credentials.
+    Each audio chunk is taken as UTF-8 text: after every chunk the words so far are returned as an
+    interim result (stability 0.9), after `latency` seconds, and a final result when the audio ends.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def recognize(self, chunks):
+        words = []
+        for chunk in chunks:
+            words.extend(chunk.decode("utf-8", errors="ignore").split())
+            time.sleep(self.latency)
+            if words:
+                yield [(" ".join(words), False, 0.9)]
+        if words:
+            yield [(" ".join(words), True, 1.0)]
+
+
+class TranscriptAssembler:
+    """
+    Builds the running transcript from streaming results: the final results so far plus the current
+    interim ones. `stable_text` only includes the leading interim results that are at least
+    `stability_threshold` stable, i.e. the part that is unlikely to change any more.
+    """
+
+    def __init__(self, stability_threshold=STT_STABILITY_THRESHOLD):
+        self.stability_threshold = stability_threshold
+        self.finals = []
+        self.text = ""
+        self.stable_text = ""
+
+    def update(self, results):
+        interim, stable = [], []
+        for transcript, is_final, stability in results:
+            transcript = transcript.strip()
+            if is_final:
+                self.finals.append(transcript)
+                continue
+            interim.append(transcript)
+            if stability >= self.stability_threshold and len(stable) == len(interim) - 1:
+                stable.append(transcript)
+        self.text = " ".join(filter(None, self.finals + interim))
+        self.stable_text = " ".join(filter(None, self.finals + stable))
+        return self.text
+
+
+_END = object()
+
+
+class StreamingTranscription:
+    """
+    Bridges async code and a blocking recognizer: audio chunks are pushed from the event loop, the
+    recognizer runs on a dedicated thread (a stream lasts as long as the user talks, so it shouldn't
+    hold a worker of the shared pool), and its results come back through `results()`.
+    """
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._audio = queue.Queue()
+        self._results = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._run, name="stt-stream", daemon=True)
+        self._thread.start()
+
+    def push(self, chunk):
+        self._audio.put(chunk)
+
+    def end(self):
+        """
+        Ends the audio; the recognizer returns its last results and stops. Safe to call more than once.
+        """
+        self._audio.put(None)
+
+    def _deliver(self, item):
+        try:
+            self._loop.call_soon_threadsafe(self._results.put_nowait, item)
+        except RuntimeError:
+            pass  # the event loop is gone
+
+    def _run(self):
+        try:
+            for results in self.recognizer.recognize(iter(self._audio.get, None)):
+                self._deliver(results)
+            self._deliver(_END)
+        except Exception as e:
+            self._deliver(e)
+
+    async def results(self):
+        """
+        Yields each response's results as (transcript, is_final, stability) lists until the recognizer stops.
+        Raises the recognizer's error, if any.
+        """
+        while True:
+            item = await self._results.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
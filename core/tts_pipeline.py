@@ -0,0 +1,76 @@
+import io
+import re
+import wave
+import struct
+import asyncio
+from collections import deque
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+STREAMING_DATA_SIZE = 0xFFFFFFFF  # "unknown length", accepted by browsers and most players
+
+
+def split_sentences(chunks, min_chars=20):
+    """
+    Turns a stream of text chunks into a stream of sentences, yielding each one as soon as it is complete.
+    Sentences shorter than `min_chars` are merged with the next one to avoid tiny synthesis calls.
+    """
+    buffer, carry = "", ""
+    for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = SENTENCE_END.split(buffer)
+        for sentence in complete:
+            carry = f"{carry} {sentence}".strip()
+            if len(carry) >= min_chars:
+                yield carry
+                carry = ""
+    tail = f"{carry} {buffer}".strip()
+    if tail:
+        yield tail
+
+
+def wav_stream_header(sample_rate=24000, channels=1, sample_width=2):
+    """
+    44-byte WAV header for a stream whose length isn't known up front (RIFF and data sizes set to the maximum).
+    """
+    byte_rate = sample_rate * channels * sample_width
+    return b"".join([
+        b"RIFF", struct.pack("<I", STREAMING_DATA_SIZE), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8),
+        b"data", struct.pack("<I", STREAMING_DATA_SIZE),
+    ])
+
+
+def pcm_frames(audio_content):
+    """
+    Returns raw PCM samples, stripping the WAV header Google TTS puts on LINEAR16 responses.
+    """
+    if audio_content[:4] != b"RIFF":
+        return audio_content
+    with wave.open(io.BytesIO(audio_content), "rb") as wf:
+        return wf.readframes(wf.getnframes())
+
+
+async def synthesize_pipelined(sentences, synthesize, max_parallel=3):
+    """
+    Synthesizes sentences from an async iterator concurrently (at most `max_parallel` at a time)
+    and yields their PCM audio in sentence order as soon as each is ready.
+    `synthesize` is a coroutine function: text -> LINEAR16 audio bytes.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    pending = deque()
+
+    async def synthesize_one(sentence):
+        async with semaphore:
+            return pcm_frames(await synthesize(sentence))
+
+    try:
+        async for sentence in sentences:
+            pending.append(asyncio.create_task(synthesize_one(sentence)))
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # Client went away or a synthesis failed: don't leave orphaned TTS calls running
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,196 @@
+import os
+
+import numpy as np
+from llama_index.core.schema import NodeWithScore
+
+# Storage type of the vector matrix: "float32" (default) or "float16" to halve its memory
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32")
+# Metadata keys with a precomputed row mask per value, usable as search filters
+FILTER_KEYS = ("source",)
+# float16 rows are upcast in cache-sized blocks of this many, since NumPy has no BLAS path for half precision
+_BLOCK_ROWS = 4096
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _top_k(scores, top_k):
+    """
+    Row-wise top-k of a (queries, rows) score matrix: (indices, scores), best first.
+    """
+    k = min(top_k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp), np.empty((scores.shape[0], 0), dtype=np.float32)
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+class VectorIndex:
+    """
+    Exact cosine-similarity search over a contiguous matrix of unit-length node embeddings.
+
+    A query is one matrix-vector product plus `argpartition` for the top k, and a batch of queries is one
+    matrix-matrix product. Rows can be restricted with metadata filters, e.g. {"source": "hr.pdf"}, which
+    combine masks precomputed for every value of the `FILTER_KEYS`. Indexes are immutable: `updated`
+    returns a new one, so searches in flight keep using the old matrix.
+    """
+
+    def __init__(self, node_ids, vectors, metadata=None, dtype=VECTOR_DTYPE, filter_keys=FILTER_KEYS):
+        self.node_ids = list(node_ids)
+        self.rows = {node_id: row for row, node_id in enumerate(self.node_ids)}
+        self.dtype = np.dtype(dtype)
+        if self.node_ids:
+            self.matrix = np.ascontiguousarray(_normalize(vectors), dtype=self.dtype)
+        else:
+            self.matrix = np.zeros((0, 0), dtype=self.dtype)
+
+        # key -> per-row values, and key -> value -> boolean row mask
+        self.filter_keys = tuple(filter_keys)
+        self.values, self.masks = {}, {}
+        metadata = metadata or [{} for _ in self.node_ids]
+        for key in self.filter_keys:
+            self._set_values(key, np.array([m.get(key) for m in metadata], dtype=object))
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def _set_values(self, key, values):
+        self.values[key] = values
+        self.masks[key] = {value: values == value for value in set(values.tolist())}
+
+    @classmethod
+    def from_nodes(cls, nodes, dtype=VECTOR_DTYPE, filter_keys=FILTER_KEYS):
+        """
+        Builds the index from nodes that already carry their embeddings (KnowledgeBase drops them afterwards).
+        """
+        nodes = list(nodes)
+        return cls(
+            [node.node_id for node in nodes],
+            [node.embedding for node in nodes],
+            [node.metadata for node in nodes],
+            dtype=dtype,
+            filter_keys=filter_keys,
+        )
+
+    @classmethod
+    def from_matrix(cls, node_ids, matrix, metadata=None, dtype=VECTOR_DTYPE, filter_keys=FILTER_KEYS):
+        """
+        Wraps a matrix of already unit-length rows, e.g. the memory-mapped `matrix` of a saved index,
+        without copying it unless it has to be converted to `dtype`.
+        """
+        index = cls([], [], dtype=dtype, filter_keys=filter_keys)
+        index.node_ids = list(node_ids)
+        index.rows = {node_id: row for row, node_id in enumerate(index.node_ids)}
+        if index.node_ids:
+            index.matrix = matrix if matrix.dtype == index.dtype else np.ascontiguousarray(matrix, dtype=index.dtype)
+        metadata = metadata or [{} for _ in index.node_ids]
+        for key in index.filter_keys:
+            index._set_values(key, np.array([m.get(key) for m in metadata], dtype=object))
+        return index
+
+    def updated(self, removed_ids, added_nodes):
+        """
+        Returns a new index without `removed_ids` and with `added_nodes` appended. Kept rows are copied
+        from this matrix, so only the added embeddings are converted and normalized.
+        """
+        removed_ids = set(removed_ids) & self.rows.keys()
+        added_nodes = list(added_nodes)
+        if not removed_ids and not added_nodes:
+            return self  # nothing to copy, e.g. the first refresh after loading a memory-mapped index
+        keep = np.array([node_id not in removed_ids for node_id in self.node_ids], dtype=bool)
+
+        index = VectorIndex([], [], dtype=self.dtype, filter_keys=self.filter_keys)
+        index.node_ids = [node_id for node_id, kept in zip(self.node_ids, keep) if kept]
+        index.node_ids.extend(node.node_id for node in added_nodes)
+        index.rows = {node_id: row for row, node_id in enumerate(index.node_ids)}
+        parts = [self.matrix[keep]] if len(self) else []
+        if added_nodes:
+            parts.append(_normalize([node.embedding for node in added_nodes]).astype(self.dtype))
+        if parts:
+            index.matrix = np.ascontiguousarray(np.concatenate(parts))
+        for key in self.filter_keys:
+            added_values = np.array([node.metadata.get(key) for node in added_nodes], dtype=object)
+            values = np.concatenate([self.values[key][keep] if len(self) else np.array([], dtype=object), added_values])
+            index._set_values(key, values)
+        return index
+
+    def mask(self, filters):
+        """
+        Boolean row mask for {key: value or list of values}; None when there are no filters.
+        """
+        if not filters:
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        empty = np.zeros(len(self), dtype=bool)
+        for key, wanted in filters.items():
+            if key not in self.masks:
+                raise ValueError(f"Cannot filter on '{key}', filterable keys are {list(self.filter_keys)}")
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            key_mask = empty.copy()
+            for value in wanted:
+                key_mask |= self.masks[key].get(value, empty)
+            mask &= key_mask
+        return mask
+
+    def _scores(self, queries):
+        if self.dtype == np.float32:
+            return queries @ self.matrix.T
+        scores = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        block = np.empty((min(_BLOCK_ROWS, len(self)), self.matrix.shape[1]), dtype=np.float32)
+        for start in range(0, len(self), _BLOCK_ROWS):
+            rows = self.matrix[start:start + _BLOCK_ROWS]
+            block[:len(rows)] = rows
+            scores[:, start:start + len(rows)] = queries @ block[:len(rows)].T
+        return scores
+
+    def search_batch(self, queries, top_k=10, filters=None):
+        """
+        Returns one [(node id, cosine similarity)] list per query embedding, best first.
+        """
+        queries = _normalize(np.atleast_2d(queries))
+        if not len(self):
+            return [[] for _ in queries]
+        scores = self._scores(queries)
+        mask = self.mask(filters)
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+            top_k = min(top_k, int(mask.sum()))
+        rows, row_scores = _top_k(scores, top_k)
+        return [
+            [(self.node_ids[row], float(score)) for row, score in zip(query_rows, query_scores)]
+            for query_rows, query_scores in zip(rows, row_scores)
+        ]
+
+    def search(self, query, top_k=10, filters=None):
+        """
+        Returns [(node id, cosine similarity)] for the top_k rows closest to the query embedding, best first.
+        """
+        return self.search_batch([query], top_k, filters)[0]
+
+
+class VectorRetriever:
+    """
+    Retriever over a VectorIndex with the same `retrieve(QueryBundle)` interface as LlamaIndex retrievers.
+    `embed_query` is only called for bundles that don't already carry an embedding.
+    """
+
+    def __init__(self, vector_index, nodes, embed_query, similarity_top_k=10):
+        self.vector_index = vector_index
+        self.nodes = nodes
+        self.embed_query = embed_query
+        self.similarity_top_k = similarity_top_k
+
+    def retrieve(self, query_bundle, filters=None):
+        embedding = query_bundle.embedding or self.embed_query(query_bundle.query_str)
+        return [
+            NodeWithScore(node=self.nodes[node_id], score=score)
+            for node_id, score in self.vector_index.search(embedding, self.similarity_top_k, filters)
+        ]
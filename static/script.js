@@ -3,6 +3,13 @@ let isListening = false;
 let finalTranscript = '';
 let interim = '';
 let botAudio = null;  // Track current bot audio
+let mediaRecorder = null;  // Mic recorder while streaming audio to the server
+let audioSocket = null;
+
+const STREAMING_MIME_TYPE = 'audio/webm;codecs=opus';
+
+// Conversation session: the server keeps the chat history, so each question only sends this id
+let sessionId = sessionStorage.getItem('sessionId');
 
 const micButton = document.getElementById('mic-button');
 const userInput = document.getElementById('user-input');
@@ -172,44 +179,237 @@ function addMessage(message, sender) {
     msg.textContent = `${sender === 'user' ? 'You' : 'Bot'}: ${message}`;
     chatBox.appendChild(msg);
     chatBox.scrollTop = chatBox.scrollHeight;
+    return msg;
 }
 
-async function sendTextQuery(query, useTTS = false) {
-    addMessage(query, 'user');
-    userInput.value = '';
-    liveTranscript.textContent = 'Thinking...';
+async function ensureSession() {
+    if (sessionId) return sessionId;
+    try {
+        const res = await fetch('/api/sessions', { method: 'POST' });
+        if (res.ok) rememberSession((await res.json()).session_id);
+    } catch (e) {
+        console.warn('Could not start a session:', e);
+    }
+    return sessionId;
+}
+
+// The server replaces an expired session with a new one and returns its id with the answer
+function rememberSession(id) {
+    if (!id) return;
+    sessionId = id;
+    sessionStorage.setItem('sessionId', id);
+}
+
+// Streams the answer from /api/ask-text-stream, rendering each chunk as it arrives.
+// Returns the full answer text.
+// An error response from the server (e.g. 429 rate limited, 504 timed out); retrying right away won't help
+class ServerError extends Error {}
+
+async function serverError(res) {
+    let detail = `Request failed (${res.status}).`;
+    try {
+        detail = (await res.json()).detail || detail;
+    } catch (e) {
+        // Not a JSON error body
+    }
+    return new ServerError(detail);
+}
+
+async function streamAnswer(query) {
+    const res = await fetch('/api/ask-text-stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text: query, session_id: await ensureSession() })
+    });
+    if (!res.ok) {
+        throw await serverError(res);
+    }
+    if (!res.body) {
+        throw new Error('Streaming responses are not supported');
+    }
 
+    const msg = addMessage('', 'bot');
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    let answer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+
+        // Server-sent events are separated by a blank line
+        let boundary;
+        while ((boundary = buffered.indexOf('\n\n')) !== -1) {
+            const event = buffered.slice(0, boundary);
+            buffered = buffered.slice(boundary + 2);
+            if (!event.startsWith('data: ')) continue;
+
+            const payload = JSON.parse(event.slice(6));
+            if (payload.delta) {
+                if (!answer) liveTranscript.textContent = '';
+                answer += payload.delta;
+                msg.textContent = `Bot: ${answer}`;
+                chatBox.scrollTop = chatBox.scrollHeight;
+            }
+            if (payload.done) rememberSession(payload.session_id);
+        }
+    }
+    return answer.trim();
+}
+
+async function fetchAnswer(query) {
     const textRes = await fetch('/api/ask-text', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ text: query })
+        body: JSON.stringify({ text: query, session_id: await ensureSession() })
     });
+    if (!textRes.ok) {
+        throw await serverError(textRes);
+    }
     const data = await textRes.json();
+    rememberSession(data.session_id);
     addMessage(data.answer, 'bot');
+    return data.answer;
+}
 
-    if (useTTS) {
-        const ttsRes = await fetch('/api/ask-tts', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ text: data.answer })
-        });
+async function sendTextQuery(query, useTTS = false) {
+    addMessage(query, 'user');
+    userInput.value = '';
+    liveTranscript.textContent = 'Thinking...';
 
-        if (!ttsRes.ok) {
-            console.error('TTS error:', await ttsRes.text());
-            return;
+    let answer;
+    try {
+        try {
+            answer = await streamAnswer(query);
+        } catch (e) {
+            // Only network errors and browsers without streaming get the non-streaming fallback
+            if (e instanceof ServerError) throw e;
+            console.warn('Falling back to non-streaming answer:', e);
+            answer = await fetchAnswer(query);
         }
+    } catch (e) {
+        liveTranscript.textContent = '';
+        addMessage(e instanceof ServerError ? e.message : 'Could not reach the server. Please try again.', 'bot');
+        return;
+    }
 
-        const blob = await ttsRes.blob();
-        const audioUrl = URL.createObjectURL(blob);
+    if (useTTS) {
+        await speakAnswer(answer);
+    }
+}
 
-        // Stop any currently playing bot audio before playing new
-        if (botAudio) {
-            botAudio.pause();
-            botAudio.currentTime = 0;
+async function speakAnswer(answer) {
+    const ttsRes = await fetch('/api/ask-tts', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text: answer })
+    });
+
+    if (!ttsRes.ok) {
+        console.error('TTS error:', await ttsRes.text());
+        return;
+    }
+
+    const blob = await ttsRes.blob();
+    const audioUrl = URL.createObjectURL(blob);
+
+    // Stop any currently playing bot audio before playing new
+    if (botAudio) {
+        botAudio.pause();
+        botAudio.currentTime = 0;
+    }
+
+    botAudio = new Audio(audioUrl);
+    botAudio.play();
+}
+
+// Server-side streaming recognition: mic audio goes to /api/ws/ask-audio in WEBM_OPUS chunks, live transcripts
+// come back while the user speaks, and the answer streams back over the same socket once they stop.
+function streamingSupported() {
+    return 'WebSocket' in window && 'MediaRecorder' in window && navigator.mediaDevices &&
+        MediaRecorder.isTypeSupported(STREAMING_MIME_TYPE);
+}
+
+function resetMicButton() {
+    isListening = false;
+    micButton.innerHTML = '<i class="fas fa-microphone"></i>';
+    micButton.classList.remove('recording');
+}
+
+async function startStreamingMic() {
+    let stream;
+    try {
+        stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+    } catch (e) {
+        console.error('Microphone access failed:', e);
+        resetMicButton();
+        liveTranscript.textContent = 'Microphone access denied. Please allow microphone access in your browser settings.';
+        return;
+    }
+
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const session = await ensureSession();
+    const query = session ? `?session_id=${encodeURIComponent(session)}` : '';
+    const socket = new WebSocket(`${protocol}://${window.location.host}/api/ws/ask-audio${query}`);
+    audioSocket = socket;
+    let msg = null;
+    let answer = '';
+
+    socket.onopen = () => {
+        mediaRecorder = new MediaRecorder(stream, { mimeType: STREAMING_MIME_TYPE });
+        mediaRecorder.ondataavailable = (event) => {
+            if (event.data.size && socket.readyState === WebSocket.OPEN) socket.send(event.data);
+        };
+        mediaRecorder.onstop = () => {
+            stream.getTracks().forEach((track) => track.stop());
+            if (socket.readyState === WebSocket.OPEN) socket.send(JSON.stringify({ type: 'stop' }));
+        };
+        mediaRecorder.start(250);
+    };
+
+    socket.onmessage = async (event) => {
+        const payload = JSON.parse(event.data);
+        if (payload.type === 'transcript') {
+            liveTranscript.textContent = payload.text;
+            if (payload.final) {
+                addMessage(payload.text, 'user');
+                liveTranscript.textContent = 'Thinking...';
+            }
+        } else if (payload.type === 'delta') {
+            if (!msg) {
+                msg = addMessage('', 'bot');
+                liveTranscript.textContent = '';
+            }
+            answer += payload.delta;
+            msg.textContent = `Bot: ${answer}`;
+            chatBox.scrollTop = chatBox.scrollHeight;
+        } else if (payload.type === 'done') {
+            rememberSession(payload.session_id);
+            await speakAnswer(payload.answer);
+        } else if (payload.type === 'error') {
+            liveTranscript.textContent = payload.detail;
+            setTimeout(() => {
+                liveTranscript.textContent = 'Live transcript will appear here...';
+            }, 3000);
         }
+    };
 
-        botAudio = new Audio(audioUrl);
-        botAudio.play();
+    socket.onclose = (event) => {
+        if (mediaRecorder && mediaRecorder.state !== 'inactive') mediaRecorder.stop();
+        stream.getTracks().forEach((track) => track.stop());
+        if (event.reason) liveTranscript.textContent = event.reason;
+        resetMicButton();
+        audioSocket = null;
+    };
+}
+
+function stopStreamingMic() {
+    if (mediaRecorder && mediaRecorder.state !== 'inactive') {
+        mediaRecorder.stop();  // flushes the last chunk, then sends the stop message
+    } else if (audioSocket) {
+        audioSocket.close();
     }
 }
 
@@ -229,6 +429,28 @@ sendButton.addEventListener('click', () => {
 
 // Mic button click
 micButton.addEventListener('click', () => {
+    if (streamingSupported()) {
+        // Stop bot speech before listening
+        if (botAudio && !botAudio.paused) {
+            botAudio.pause();
+            botAudio.currentTime = 0;
+        }
+        if (!isListening) {
+            isListening = true;
+            micButton.innerHTML = 'Listening';
+            micButton.classList.add('recording');
+            liveTranscript.textContent = 'Listening...';
+            startStreamingMic();
+        } else {
+            isListening = false;
+            micButton.innerHTML = '<i class="fas fa-microphone"></i>';
+            micButton.classList.remove('recording');
+            liveTranscript.textContent = 'Processing...';
+            stopStreamingMic();
+        }
+        return;
+    }
+
     if (!recognition) {
         if (!setupRecognition()) {
             liveTranscript.textContent = 'Speech recognition is not available in this browser.';
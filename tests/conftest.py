@@ -0,0 +1,82 @@
+import os
+import sys
+import shutil
+import zlib
+from unittest import mock
+
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+FAQS = """What is the remote work policy?
+Employees may work remotely up to three days per week with manager approval.
+How do I reset my password?
+Use the self-service portal and follow the emailed link.
+When is payday?
+Salaries are paid on the 25th of every month.
+"""
+
+
+def hashing_embedding():
+    """Deterministic bag-of-words embedding, so tests need neither the embedding model nor a network."""
+    from llama_index.core.embeddings import BaseEmbedding
+
+    class HashingEmbedding(BaseEmbedding):
+        def _embed(self, text):
+            vector = np.zeros(64, dtype=np.float32)
+            for word in text.lower().split():
+                digest = zlib.crc32(word.strip(".,?!").encode("utf-8"))
+                vector[digest % 64] += 1
+            norm = np.linalg.norm(vector)
+            return (vector / norm if norm else vector).tolist()
+
+        def _get_query_embedding(self, query):
+            return self._embed(query)
+
+        def _get_text_embedding(self, text):
+            return self._embed(text)
+
+        async def _aget_query_embedding(self, query):
+            return self._embed(query)
+
+    return HashingEmbedding(model_name="hashing")
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """
+    api.main imported offline: local fakes for Gemini, streaming speech recognition, the Google clients and
+    the embedding model, serving a small FAQ file from a temporary working directory.
+    """
+    work = tmp_path_factory.mktemp("app")
+    shutil.copytree(os.path.join(REPO_ROOT, "static"), work / "static")
+    (work / "data").mkdir()
+    (work / "data" / "faq.txt").write_text(FAQS, encoding="utf-8")
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(work)
+        for name, value in {
+            "STT_BACKEND": "fake",
+            "LLM_BACKEND": "fake",
+            "FAKE_LLM_LATENCY_SECONDS": "0",
+            "RATE_LIMIT_BACKEND": "memory",
+            "RATE_LIMIT_ASK": "1000/60",
+            "RATE_LIMIT_TRANSCRIBE": "1000/60",
+            "RETRIEVAL_SCORE_THRESHOLD": "-1",
+            "QUESTION_MATCH_THRESHOLD": "2",
+            "PARSE_MAX_WORKERS": "1",
+            "INDEX_DIR": str(work / "index_store"),
+        }.items():
+            patch.setenv(name, value)
+
+        from google.cloud import speech, texttospeech
+        import core.embeddings
+
+        patch.setattr(speech, "SpeechClient", mock.MagicMock)
+        patch.setattr(texttospeech, "TextToSpeechClient", mock.MagicMock)
+        patch.setattr(core.embeddings, "_load_embed_model", hashing_embedding)
+
+        import api.main
+        yield api.main
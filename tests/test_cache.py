@@ -0,0 +1,27 @@
+import numpy as np
+
+from core.cache import SemanticCache
+
+
+def unit(i, dim=8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[i] = 1
+    return vector
+
+
+def test_semantic_cache_reuses_rows_of_evicted_and_stale_entries():
+    cache = SemanticCache(threshold=0.99, max_entries=3)
+    for i in range(5):
+        cache.put(f"q{i}", unit(i), 1, f"a{i}")
+
+    assert [cache.get(unit(i), 1) for i in range(5)] == [None, None, "a2", "a3", "a4"]
+    cache.put("q2", unit(2), 1, "a2 updated")
+    assert cache.get(unit(2), 1) == "a2 updated"
+    assert cache.stats()["entries"] == 3
+
+    # A new index generation drops every entry answered against the old one
+    assert cache.get(unit(3), 2) is None
+    assert cache.stats()["entries"] == 0
+    cache.put("q5", unit(5), 2, "a5")
+    assert cache.get(unit(5), 2) == "a5"
+    assert len(cache._vectors) == 3
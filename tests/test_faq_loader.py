@@ -0,0 +1,28 @@
+import sys
+import subprocess
+
+import core.faq_loader
+from conftest import REPO_ROOT
+
+
+def test_parse_workers_do_not_import_llama_index():
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, core.faq_loader; print(any(m.startswith('llama_index') for m in sys.modules))"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    ).stdout.splitlines()[-1]
+    assert loaded == "False"
+
+
+def test_small_batches_are_parsed_in_process(tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("started a process pool")
+
+    monkeypatch.setattr(core.faq_loader, "ProcessPoolExecutor", no_pool)
+    files = []
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text("When is payday?\nOn the 25th.\n", encoding="utf-8")
+        files.append(str(tmp_path / name))
+
+    parsed = list(core.faq_loader.iter_parsed_files(files, max_workers=4))
+    assert sorted(path for path, _, _ in parsed) == files
+    assert all(pairs and error is None for _, pairs, error in parsed)
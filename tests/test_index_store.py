@@ -0,0 +1,30 @@
+import os
+
+import core.knowledge_base
+from core.knowledge_base import KnowledgeBase
+
+from conftest import FAQS
+
+
+def test_cold_start_without_embedding_cache_embeds_nothing(app_module, tmp_path, monkeypatch):
+    data_dir, index_dir = tmp_path / "data", tmp_path / "index_store"
+    data_dir.mkdir()
+    (data_dir / "faq.txt").write_text(FAQS, encoding="utf-8")
+    KnowledgeBase(str(data_dir), index_dir=str(index_dir), parse_workers=1).refresh()
+    # What a deploy ships: the saved index without the embedding cache
+    os.remove(index_dir / "embeddings.sqlite")
+
+    embedded = []
+    original = core.knowledge_base.embed_texts
+
+    def embed_texts(texts, *args, **kwargs):
+        embedded.extend(texts)
+        return original(texts, *args, **kwargs)
+
+    monkeypatch.setattr(core.knowledge_base, "embed_texts", embed_texts)
+    kb = KnowledgeBase(str(data_dir), index_dir=str(index_dir), parse_workers=1)
+    kb.refresh()
+
+    assert embedded == []
+    assert len(kb.question_index) == 3
+    assert kb.question_index.match_exact("when is payday?")["answer"].startswith("Salaries")
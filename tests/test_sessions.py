@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+
+def ask(client, text, session_id):
+    response = client.post("/api/ask-text", json={"text": text, "session_id": session_id})
+    assert response.status_code == 200, response.text
+    return response.json()["answer"]
+
+
+def test_questions_later_in_a_session_use_the_fast_path_and_answer_cache(app_module):
+    client = TestClient(app_module.app)
+    session_id = client.post("/api/sessions").json()["session_id"]
+    before = app_module.ANSWERS.snapshot()
+
+    first = ask(client, "Can I work from home on Fridays?", session_id)
+    assert ask(client, "Can I work from home on Fridays?", session_id) == first
+    assert ask(client, "How do I reset my password?", session_id) == "Use the self-service portal and follow the emailed link."
+
+    after = app_module.ANSWERS.snapshot()
+    answered = {source[0]: after[source] - before.get(source, 0) for source in after if after[source] != before.get(source, 0)}
+    assert answered == {"gemini": 1, "cache": 1, "fast_path": 1}
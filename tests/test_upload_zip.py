@@ -0,0 +1,50 @@
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def upload_zip(client, members):
+    archive = zip_bytes(members)
+    return client.post("/api/upload-zip", files={"file": ("faqs.zip", archive, "application/zip")})
+
+
+def test_same_name_in_different_folders_is_kept_under_a_numbered_name(app_module):
+    client = TestClient(app_module.app)
+    response = upload_zip(client, {
+        "hr/holidays.txt": "How many holidays do I get?\nTwenty-five days a year.\n",
+        "it/holidays.txt": "Is IT support available on holidays?\nOnly for outages.\n",
+    })
+
+    assert response.status_code == 202
+    files = response.json()["files"]
+    assert files["hr/holidays.txt"]["filename"] == "holidays.txt"
+    assert "renamed_from" not in files["hr/holidays.txt"]
+    assert files["it/holidays.txt"]["filename"] == "holidays-2.txt"
+    assert files["it/holidays.txt"]["renamed_from"] == "holidays.txt"
+    assert "Twenty-five" in (app_module.DATA_DIR / "holidays.txt").read_text()
+    assert "outages" in (app_module.DATA_DIR / "holidays-2.txt").read_text()
+
+
+def test_existing_file_is_not_overwritten(app_module):
+    client = TestClient(app_module.app)
+    original = (app_module.DATA_DIR / "faq.txt").read_text()
+    response = upload_zip(client, {
+        "faq.txt": "What is new?\nNothing.\n",
+        "new/benefits.txt": "Do we have a gym?\nYes, on the ground floor.\n",
+    })
+
+    assert response.status_code == 202
+    files = response.json()["files"]
+    assert files["faq.txt"]["status"] == "rejected"
+    assert "already exists" in files["faq.txt"]["error"]
+    assert files["new/benefits.txt"]["status"] == "saved"
+    assert (app_module.DATA_DIR / "faq.txt").read_text() == original
@@ -0,0 +1,67 @@
+from fastapi.testclient import TestClient
+
+
+def multipart_chunks(filename, size, boundary="upload-boundary"):
+    """A multipart/form-data body as a generator, so it is sent chunked without a Content-Length."""
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: text/plain\r\n\r\n"
+    ).encode("utf-8")
+    for _ in range(size // 4096):
+        yield b"x" * 4096
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+
+def test_chunked_upload_without_content_length_is_capped(app_module, monkeypatch):
+    monkeypatch.setitem(app_module.UPLOAD_LIMITS, "/api/upload-file", 1024)
+    client = TestClient(app_module.app)
+    received = []
+    original = app_module.save_upload
+
+    async def save_upload(*args, **kwargs):
+        received.append(args)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(app_module, "save_upload", save_upload)
+    response = client.post(
+        "/api/upload-file",
+        content=multipart_chunks("big.txt", 1 << 20),
+        headers={"Content-Type": "multipart/form-data; boundary=upload-boundary"},
+    )
+
+    assert response.status_code == 413, response.text
+    assert "too large" in response.json()["detail"]
+    assert received == []  # cut off while the body was read, before the handler ran
+    assert not (app_module.DATA_DIR / "big.txt").exists()
+
+
+def test_uploads_in_progress_are_not_listed_or_deletable(app_module):
+    client = TestClient(app_module.app)
+    partial = app_module.DATA_DIR / ".upload-abc123.part"
+    partial.write_bytes(b"half written")
+    try:
+        names = [file["name"] for file in client.get("/api/files").json()["files"]]
+        assert "faq.txt" in names
+        assert partial.name not in names
+
+        assert client.delete(f"/api/files/{partial.name}").status_code == 404
+        assert partial.exists()
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def test_repeated_name_in_one_bulk_upload_is_kept_under_a_numbered_name(app_module):
+    client = TestClient(app_module.app)
+    response = client.post("/api/upload-files", files=[
+        ("files", ("benefits.txt", b"Do we have a gym?\nYes, on the ground floor.\n", "text/plain")),
+        ("files", ("benefits.txt", b"Is there a pension plan?\nYes, matched up to 5%.\n", "text/plain")),
+    ])
+
+    assert response.status_code == 202, response.text
+    files = response.json()["files"]
+    assert files["benefits.txt"] == {"status": "saved", "filename": "benefits.txt", "size": 44}
+    assert files["benefits-2.txt"]["filename"] == "benefits-2.txt"
+    assert files["benefits-2.txt"]["renamed_from"] == "benefits.txt"
+    assert "gym" in (app_module.DATA_DIR / "benefits.txt").read_text()
+    assert "pension" in (app_module.DATA_DIR / "benefits-2.txt").read_text()
@@ -0,0 +1,148 @@
+import json
+import time
+import logging
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from core.streaming_stt import FakeStreamingRecognizer
+from utils.security import RateLimiter, MemoryRateLimitBackend
+
+
+class ScriptedRecognizer:
+    """Returns one scripted response per audio chunk, then the final transcript once the audio ends."""
+
+    def __init__(self, responses, final):
+        self.responses = responses
+        self.final = final
+        self.audio_ended = threading.Event()
+
+    def recognize(self, chunks):
+        responses = iter(self.responses)
+        for _ in chunks:
+            response = next(responses, None)
+            if response:
+                yield response
+        self.audio_ended.set()
+        yield [(self.final, True, 1.0)]
+
+
+@pytest.fixture
+def main(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "streaming_recognizer", FakeStreamingRecognizer())
+    monkeypatch.setattr(app_module, "rate_limiter", RateLimiter(MemoryRateLimitBackend()))
+    return app_module
+
+
+@pytest.fixture
+def client(main):
+    return TestClient(main.app)
+
+
+def stream(client, chunks, path="/api/ws/ask-audio"):
+    """Sends the audio chunks, then stop, and returns the messages received until the socket closes."""
+    messages = []
+    with client.websocket_connect(path) as websocket:
+        for chunk in chunks:
+            websocket.send_bytes(chunk.encode("utf-8"))
+        websocket.send_text(json.dumps({"type": "stop"}))
+        while True:
+            try:
+                messages.append(websocket.receive_json())
+            except WebSocketDisconnect:
+                return messages
+
+
+def test_interim_transcripts_then_streamed_answer(client):
+    messages = stream(client, ["how do I", "reset my password"])
+
+    transcripts = [message for message in messages if message["type"] == "transcript"]
+    assert [(message["text"], message["final"]) for message in transcripts] == [
+        ("how do I", False),
+        ("how do I reset my password", False),
+        ("how do I reset my password", True),
+    ]
+    deltas = [message["delta"] for message in messages if message["type"] == "delta"]
+    assert deltas
+    done = messages[-1]
+    assert done["type"] == "done"
+    assert done["answer"] == "".join(deltas).strip()
+
+
+def test_transcripts_only_without_answer(client):
+    messages = stream(client, ["when is payday"], "/api/ws/ask-audio?answer=false")
+
+    assert messages[-1] == {"type": "transcript", "text": "when is payday", "stable_text": "when is payday", "final": True}
+    assert not any(message["type"] in ("delta", "done") for message in messages)
+
+
+def test_speculation_on_stable_transcript_is_used(main, client):
+    before = main.SPECULATIONS.snapshot()
+    messages = stream(client, ["how do I reset my password"])
+
+    assert messages[-1]["type"] == "done"
+    assert messages[-1]["speculative"] is True
+    after = main.SPECULATIONS.snapshot()
+    assert after.get(("used",), 0) == before.get(("used",), 0) + 1
+
+
+def test_speculation_is_discarded_when_final_transcript_differs(main, client, monkeypatch):
+    # The final transcript is too short to start a speculation of its own
+    monkeypatch.setattr(main, "STT_SPECULATE_MIN_WORDS", 4)
+    monkeypatch.setattr(main, "streaming_recognizer", ScriptedRecognizer(
+        [[("what is the remote work policy", False, 0.9)]],
+        final="when is payday",
+    ))
+    before = main.SPECULATIONS.snapshot()
+    messages = stream(client, ["audio"])
+
+    assert messages[-1]["type"] == "done"
+    assert messages[-1]["speculative"] is False
+    after = main.SPECULATIONS.snapshot()
+    assert after.get(("discarded",), 0) == before.get(("discarded",), 0) + 1
+
+
+def test_speculative_lookups_do_not_count_as_cache_misses(main, client, monkeypatch):
+    monkeypatch.setattr(main, "streaming_recognizer", ScriptedRecognizer(
+        [[("what is the remote", False, 0.9)], [("what is the remote work", False, 0.9)]],
+        final="when do we get paid",
+    ))
+    before = main.answer_cache.stats()
+    stream(client, ["first", "second"])
+
+    after = main.answer_cache.stats()
+    # Only the final transcript's own lookup is counted
+    assert after["hits"] + after["misses"] == before["hits"] + before["misses"] + 1
+
+
+def test_disconnect_mid_stream_ends_recognition_without_answering(main, client, monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger="api.main")
+    recognizer = ScriptedRecognizer([[("how do I reset", False, 0.9)]], final="how do I reset")
+    monkeypatch.setattr(main, "streaming_recognizer", recognizer)
+    answers = []
+    monkeypatch.setattr(main, "stream_answer_with_gemini", lambda *args, **kwargs: answers.append(args) or iter(()))
+
+    with client.websocket_connect("/api/ws/ask-audio") as websocket:
+        websocket.send_bytes(b"audio")
+        assert websocket.receive_json()["text"] == "how do I reset"
+        websocket.close()
+        assert recognizer.audio_ended.wait(5)
+        deadline = time.monotonic() + 5
+        while "Audio stream client disconnected." not in caplog.text and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert "Audio stream client disconnected." in caplog.text
+    assert answers == []
+
+
+def test_rate_limited_connection_is_closed_with_policy_violation(main, client, monkeypatch):
+    monkeypatch.setattr(main, "RATE_LIMIT_ASK", (1, 60))
+    stream(client, ["when is payday"])
+
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/api/ws/ask-audio"):
+            pass
+    assert closed.value.code == 1008
+    assert "Rate limit exceeded" in closed.value.reason
@@ -0,0 +1,25 @@
+import os
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded pool for blocking client calls (STT, TTS, Gemini, retrieval) made from async handlers
+MAX_BLOCKING_WORKERS = int(os.getenv("MAX_BLOCKING_WORKERS", 32))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+
+async def run_blocking(func, *args, timeout=None, **kwargs):
+    """
+    Runs a blocking call on the shared thread pool without blocking the event loop.
+
+    Raises TimeoutError if it takes longer than `timeout` seconds. On timeout or cancellation
+    a call that has not started yet is dropped from the queue; one already running finishes in
+    its thread and its result is discarded, so blocking clients should also get their own deadline.
+    The call runs in a copy of the caller's context, so context variables (e.g. request timings) carry over.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    future = loop.run_in_executor(_executor, functools.partial(context.run, func, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout)
@@ -1,14 +1,15 @@
-import requests
-import json
-import os
-import dotenv
+import logging
+
+from core.llm_client import get_llm_client
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 def polish_response_with_gemini(user_query, rag_response):
-    GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
-    print('GOOGLE_API_KEY', GOOGLE_API_KEY)
-    if not GOOGLE_API_KEY:
-        raise ValueError("Google API key not found.")
-    print('GOOGLE_API_KEY', GOOGLE_API_KEY)
+    """
+    Rewrites a RAG answer in a friendly tone through the shared LLM client; returns the RAG answer unchanged on failure.
+    """
     prompt = f"""
 You are an AI assistant to answe user question on available data:
 
@@ -17,16 +18,8 @@ A: {rag_response}
 
 Rewrite this in a friendly, helpful tone. Keep it accurate and concise.
 """
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GOOGLE_API_KEY}"
-    print('url', url)
-    headers = {"Content-Type": "application/json"}
-    body = {
-        "contents": [{"parts": [{"text": prompt}]}]
-    }
-
-    response = requests.post(url, headers=headers, data=json.dumps(body))
-    if response.status_code == 200:
-        return response.json()['candidates'][0]['content']['parts'][0]['text']
-    else:
-        print("Gemini Error:", response.text)
+    try:
+        return get_llm_client().generate(prompt)
+    except Exception as e:
+        logger.error(f"Gemini error: {e}")
         return rag_response
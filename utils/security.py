@@ -1,23 +1,165 @@
 import re
 import time
 import logging
-from collections import deque
+import threading
+from collections import OrderedDict
 
-# Configure logging
-logging.basicConfig(filename='query_input.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-MAX_QUERIES = 5
-TIME_WINDOW = 60  # seconds
-query_timestamps = deque()
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 def is_valid_query(query):
     return bool(re.match(r"^[\w\s\?\-\,\.\']{1,200}$", query))
 
-def is_rate_limited():
-    now = time.time()
-    while query_timestamps and now - query_timestamps[0] > TIME_WINDOW:
-        query_timestamps.popleft()
-    if len(query_timestamps) >= MAX_QUERIES:
-        return True
-    query_timestamps.append(now)
-    return False
+def parse_rate_limit(value):
+    """
+    Parses a limit like "5/60" (5 requests per 60 seconds) into (requests, period seconds).
+    """
+    requests, _, period = str(value).partition("/")
+    return int(requests), float(period or 60)
+
+class MemoryRateLimitBackend:
+    """
+    In-process token buckets: O(1) state per key (tokens left, last update).
+
+    A bucket that has been idle long enough to refill completely holds no information, so keys are
+    kept in least-recently-used order and those are evicted from the front as other keys are hit.
+    `max_keys` bounds memory even under a flood of distinct clients. Thread-safe.
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at, full_after seconds)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def hit(self, key, limit, period, now=None):
+        """
+        Takes a token from the key's bucket (capacity `limit`, refilled at limit/period per second).
+        Returns 0 if the request is allowed, else the seconds until a token is available.
+        """
+        now = time.monotonic() if now is None else now
+        rate = limit / period
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.pop(key, (limit, now, period))
+            tokens = min(limit, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, period)
+
+            # Evict idle keys whose buckets would be full again, then the oldest beyond max_keys
+            while self._buckets:
+                oldest_key, (_, oldest_at, full_after) = next(iter(self._buckets.items()))
+                if now - oldest_at < full_after and len(self._buckets) <= self.max_keys:
+                    break
+                del self._buckets[oldest_key]
+        return 0.0 if allowed else (1 - tokens) / rate
+
+class LocalCounterStore:
+    """
+    Stand-in for a shared counter store (the subset of Redis that SharedRateLimitBackend uses), for tests
+    and single-instance development. Keys expire after their TTL. Thread-safe.
+    """
+
+    def __init__(self):
+        self._values = {}  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def _get(self, key, now):
+        value, expires_at = self._values.get(key, (0, now))
+        return value if expires_at > now else 0
+
+    def incr_and_get(self, key, other_key, ttl_seconds):
+        now = time.time()
+        with self._lock:
+            for stale in [stale for stale, (_, expires_at) in self._values.items() if expires_at <= now]:
+                del self._values[stale]
+            value = self._get(key, now) + 1
+            self._values[key] = (value, now + ttl_seconds)
+            return value, self._get(other_key, now)
+
+    def decr(self, key):
+        with self._lock:
+            value, expires_at = self._values.get(key, (0, 0))
+            if value > 0:
+                self._values[key] = (value - 1, expires_at)
+
+class RedisCounterStore:
+    """
+    Counter store on Redis (or anything speaking its protocol, e.g. Memorystore), shared by every instance.
+    Needs the optional `redis` package.
+    """
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def incr_and_get(self, key, other_key, ttl_seconds):
+        # One MULTI/EXEC transaction: concurrent requests each see their own post-increment count
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.incr(key)
+        pipeline.expire(key, int(ttl_seconds) + 1)
+        pipeline.get(other_key)
+        value, _, other = pipeline.execute()
+        return int(value), int(other or 0)
+
+    def decr(self, key):
+        self._client.decr(key)
+
+class SharedRateLimitBackend:
+    """
+    Sliding-window counters in a shared store, so limits hold across instances and workers.
+
+    Each key has one counter per fixed window; the request rate is estimated from the current window
+    plus the previous one weighted by how much of it still overlaps the sliding window. A request
+    increments its counter first and is checked against the post-increment count, so concurrent
+    requests can't all pass the same check; rejected requests are taken back out. Counters expire
+    after two windows, so idle keys evict themselves. If the store is unreachable, requests are
+    allowed rather than failing the API.
+    """
+
+    def __init__(self, store, prefix="ratelimit"):
+        self.store = store
+        self.prefix = prefix
+
+    def hit(self, key, limit, period, now=None):
+        now = time.time() if now is None else now
+        window = int(now // period)
+        current_key = f"{self.prefix}:{key}:{window}"
+        previous_key = f"{self.prefix}:{key}:{window - 1}"
+        try:
+            current, previous = self.store.incr_and_get(current_key, previous_key, 2 * period)
+            overlap = 1 - (now % period) / period
+            if previous * overlap + current <= limit:
+                return 0.0
+            self.store.decr(current_key)
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable, allowing request: {e}")
+            return 0.0
+
+        # Rejected; `allowed` requests were counted in this window before this one
+        allowed = current - 1
+        window_end = (window + 1) * period
+        if allowed >= limit or not previous:
+            return window_end - now
+        # Until enough of the previous window has slid out: previous * overlap + allowed <= limit - 1
+        slid_out = 1 - (limit - 1 - allowed) / previous
+        return max(window * period + slid_out * period - now, 0.001)
+
+class RateLimiter:
+    """
+    Per-key request limits on a pluggable backend (MemoryRateLimitBackend or SharedRateLimitBackend).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def hit(self, name, client, limit, period):
+        """
+        Records a request from `client` to the endpoint group `name`. Returns 0 if it is within `limit`
+        requests per `period` seconds, else the seconds to wait before retrying.
+        """
+        return self.backend.hit(f"{name}:{client}", limit, period)